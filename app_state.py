@@ -0,0 +1,103 @@
+import threading
+import logging
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the app to come to the front after launching it
+LAUNCH_TIMEOUT = 10.0
+# Interval of the background ping that keeps the uiautomator2 agent warm
+KEEPALIVE_INTERVAL = 60.0
+
+
+class AppStateTracker:
+    """Session-level view of which app is in front of the device.
+
+    Checks the foreground package before launching Tasker so a step does not
+    reset the screen the previous step navigated to, waits for the launch
+    instead of sleeping a fixed time, and keeps the uiautomator2 agent warm
+    between workflows with a light periodic ping. Tasker itself is never
+    stopped, so its process stays warm as well. on_launch is called once a
+    launch has reached the foreground so callers can drop state cached for
+    the previous screen.
+    """
+
+    def __init__(self, device: Any, package: str, on_launch: Optional[Callable[[], None]] = None) -> None:
+        self.device = device
+        self.package = package
+        self.on_launch = on_launch
+        self.launches = 0
+        self.checks = 0
+        self._keepalive = None  # type: Optional[threading.Thread]
+        self._stop = threading.Event()
+
+    def foreground(self) -> Dict[str, Any]:
+        """Return the current foreground app as {'package', 'activity'}."""
+        self.checks += 1
+        try:
+            return self.device.app_current()
+        except Exception as e:
+            logger.warning("Could not read foreground app: " + str(e))
+            return {}
+
+    def isForeground(self) -> bool:
+        return self.foreground().get("package") == self.package
+
+    def ensureForeground(self) -> bool:
+        """Bring Tasker to the front only if it is not there already.
+
+        Returns:
+            bool: True if the app had to be launched.
+        """
+        if self.isForeground():
+            return False
+        logger.info("Launching " + self.package)
+        self.device.app_start(self.package)
+        self.launches += 1
+        if not self.device.app_wait(self.package, front=True, timeout=LAUNCH_TIMEOUT):
+            logger.warning(self.package + " did not reach the foreground within " + str(LAUNCH_TIMEOUT) + "s")
+        # After the wait, so the next observation is not taken during the launch animation
+        if self.on_launch is not None:
+            self.on_launch()
+        return True
+
+    def warmUp(self) -> None:
+        """Make sure the uiautomator2 agent answers and Tasker is in front, and keep them warm."""
+        self.ping()
+        self.ensureForeground()
+        self.startKeepalive()
+
+    def ping(self) -> bool:
+        """Cheap round trip to the uiautomator2 agent (uiautomator2 restarts it if it died)."""
+        try:
+            _ = self.device.info
+            return True
+        except Exception as e:
+            logger.warning("uiautomator2 agent ping failed: " + str(e))
+            return False
+
+    def startKeepalive(self, interval: float = KEEPALIVE_INTERVAL) -> None:
+        """Ping the agent and watch Tasker's process in the background between workflows."""
+        if self._keepalive is not None and self._keepalive.is_alive():
+            return
+        self._stop.clear()
+        self._keepalive = threading.Thread(
+            target=self._keepaliveLoop, args=(interval,), name="app-keepalive", daemon=True
+        )
+        self._keepalive.start()
+
+    def stopKeepalive(self) -> None:
+        self._stop.set()
+
+    def _keepaliveLoop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.ping()
+            try:
+                # Only report; relaunching here would steal the foreground from the user
+                if not self.device.app_wait(self.package, timeout=0.1):
+                    logger.info(self.package + " process is not running; it will be launched by the next step")
+            except Exception as e:
+                logger.warning("Keepalive check failed: " + str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"package": self.package, "launches": self.launches, "foreground_checks": self.checks}
@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+import time
+import uuid
+import logging
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Oldest artifacts are pruned once the store holds more than this many
+MAX_ARTIFACTS = 500
+
+
+class ArtifactStore:
+    """Out-of-band storage for bulky tool results.
+
+    Analyses, plans and screenshots are written to a directory and referred to
+    by id, so tool results that go back into the model context only carry a
+    compact summary. Each artifact is a JSON file holding its kind, creation
+    time and data; screenshots are copied next to it and referenced by path.
+    """
+
+    def __init__(self, directory: str, max_artifacts: int = MAX_ARTIFACTS) -> None:
+        self.directory = directory
+        self.max_artifacts = max_artifacts
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, artifact_id: str) -> str:
+        return os.path.join(self.directory, os.path.basename(artifact_id) + ".json")
+
+    def put(self, kind: str, data: Any) -> str:
+        """Store a JSON-serializable value and return its artifact id."""
+        artifact_id = kind + "-" + uuid.uuid4().hex[:12]
+        record = {"id": artifact_id, "kind": kind, "created_at": time.time(), "data": data}
+        tmp_path = self._path(artifact_id) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp_path, self._path(artifact_id))
+        self._prune()
+        return artifact_id
+
+    def putFile(self, kind: str, file_path: str) -> str:
+        """Copy a file (e.g. a screenshot) into the store and return its artifact id."""
+        extension = os.path.splitext(file_path)[1]
+        stored_name = kind + "-" + uuid.uuid4().hex[:12] + extension
+        stored_path = os.path.join(self.directory, stored_name)
+        shutil.copyfile(file_path, stored_path)
+        return self.put(kind, {"file": os.path.abspath(stored_path)})
+
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """Load an artifact record ('id', 'kind', 'created_at', 'data'), or None."""
+        try:
+            with open(self._path(artifact_id), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list(self) -> List[str]:
+        """Artifact ids, oldest first."""
+        names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        names.sort(key=lambda n: os.path.getmtime(os.path.join(self.directory, n)))
+        return [n[:-len(".json")] for n in names]
+
+    def _prune(self) -> None:
+        ids = self.list()
+        for artifact_id in ids[:max(0, len(ids) - self.max_artifacts)]:
+            record = self.get(artifact_id)
+            data = record.get("data") if record else None
+            if isinstance(data, dict) and "file" in data:
+                try:
+                    os.remove(data["file"])
+                except OSError:
+                    pass
+            try:
+                os.remove(self._path(artifact_id))
+            except OSError:
+                pass
+
+
+def selectPath(data: Any, path: str) -> Any:
+    """Select part of an artifact with a dotted path such as "elements.0.label".
+
+    Raises:
+        KeyError: If a path component does not exist.
+    """
+    value = data
+    for component in [c for c in path.split(".") if c]:
+        if isinstance(value, list):
+            try:
+                value = value[int(component)]
+            except (ValueError, IndexError):
+                raise KeyError(component)
+        elif isinstance(value, dict) and component in value:
+            value = value[component]
+        else:
+            raise KeyError(component)
+    return value
+
+
+def summarizeAnalysis(result: Dict[str, Any], max_labels: int = 5) -> Dict[str, Any]:
+    """Compact view of an analyzeImage result: status, element count and top labels."""
+    summary = {"success": result.get("success", False)}
+    if not result.get("success"):
+        summary["error"] = result.get("error")
+        return summary
+    analysis = result.get("analysis", {})
+    elements = analysis.get("elements", []) if isinstance(analysis, dict) else []
+    summary["element_count"] = len(elements)
+    labels = []
+    for element in elements[:max_labels]:
+        label = element.get("label") or element.get("text") or element.get("name")
+        if label:
+            labels.append({"label": label, "click_x": element.get("click_x"), "click_y": element.get("click_y")})
+    summary["top_elements"] = labels
+    if isinstance(analysis, dict) and isinstance(analysis.get("description"), str):
+        summary["description"] = analysis["description"][:200]
+    return summary
+
+
+def summarizePlan(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact view of a generatePlan result: status, step count and step actions."""
+    summary = {"success": result.get("success", False)}
+    if not result.get("success"):
+        summary["error"] = result.get("error")
+        return summary
+    plan = result.get("plan")
+    steps = plan.get("steps", []) if isinstance(plan, dict) else []
+    summary["step_count"] = len(steps)
+    summary["actions"] = [str(step.get("action", ""))[:60] for step in steps if isinstance(step, dict)]
+    if result.get("raw_response"):
+        summary["raw_response"] = True
+    return summary
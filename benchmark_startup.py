@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the agent package.
+Each scenario runs in a fresh interpreter so nothing is cached between runs.
+
+Usage: python benchmark_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Scenario name -> statement timed inside the child interpreter
+SCENARIOS = [
+    ("import tools", "import tools"),
+    ("import vision_tasker_agent", "import vision_tasker_agent"),
+    ("import workflow functions", "from vision_tasker_agent.agent import runCreationWorkflow"),
+    ("build root_agent", "import vision_tasker_agent; vision_tasker_agent.root_agent"),
+    ("build all agents", "import vision_tasker_agent as p; [getattr(p, n) for n in p.__all__]")
+]
+
+CHILD_TEMPLATE = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+def timeScenario(statement: str, runs: int) -> Tuple[Optional[List[float]], str]:
+    """Run a statement in fresh interpreters and collect wall times in seconds."""
+    timings = []
+    code = CHILD_TEMPLATE.format(root=PROJECT_ROOT, statement=statement)
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=PROJECT_ROOT
+        )
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return None, lines[-1] if lines else "exit code " + str(proc.returncode)
+        timings.append(float(proc.stdout.strip().splitlines()[-1]))
+    return timings, ""
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure agent package cold start time")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    print("Cold start benchmark (" + str(args.runs) + " runs per scenario)")
+    print("=" * 60)
+    for name, statement in SCENARIOS:
+        timings, error = timeScenario(statement, args.runs)
+        if timings is None:
+            print("{:<30} FAILED: {}".format(name, error))
+            continue
+        print("{:<30} median {:8.1f} ms   min {:8.1f} ms".format(
+            name,
+            statistics.median(timings) * 1000,
+            min(timings) * 1000
+        ))
+
+if __name__ == "__main__":
+    main()
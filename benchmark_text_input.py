@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the text input methods in text_input.py on a connected device.
+Focus an editable text field (e.g. a Tasker task name dialog) before running.
+
+Usage: python benchmark_text_input.py [--runs N] [--adb-keyboard]
+"""
+
+import argparse
+import statistics
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from text_input import METHODS, METHOD_ADB_KEYBOARD, METHOD_INPUT_TEXT, INPUT_TEXT_SAFE, injectText
+
+SAMPLES = [
+    ("short ascii", "Morning"),
+    ("sentence", "Set alarm for tomorrow morning at 7:30"),
+    ("tasker vars", "%BATT < 20 && %sms_text ~ *urgent*"),
+    ("javascriptlet", "var x = global('TIME'); flash(\"It's \" + x + ' $(now)');"),
+    ("unicode", "Réveil ⏰ 07:30 – café ☕"),
+    ("long", "Lorem ipsum dolor sit amet " * 20)
+]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare text input methods")
+    parser.add_argument("--runs", type=int, default=3, help="repetitions per method and sample")
+    parser.add_argument("--adb-keyboard", action="store_true", help="include the ADBKeyboard IME method")
+    args = parser.parse_args()
+
+    from tools import getDevice
+    device = getDevice()
+    methods = [m for m in METHODS if args.adb_keyboard or m != METHOD_ADB_KEYBOARD]
+
+    print("{:<14} {:>6}  ".format("sample", "chars") + "".join("{:>14}".format(m) for m in methods + ["auto"]))
+    for name, text in SAMPLES:
+        row = "{:<14} {:>6}  ".format(name, len(text))
+        for method in methods + [None]:
+            if method == METHOD_INPUT_TEXT and not INPUT_TEXT_SAFE.match(text):
+                row += "{:>14}".format("n/a")
+                continue
+            timings = []
+            try:
+                for _ in range(args.runs):
+                    device.clear_text()
+                    timings.append(injectText(device, text, method, args.adb_keyboard)["elapsed"])
+                row += "{:>11.1f} ms".format(statistics.median(timings) * 1000)
+            except Exception:
+                row += "{:>14}".format("failed")
+        print(row)
+    device.clear_text()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    workflow_id TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    workflow_id TEXT NOT NULL REFERENCES workflows(workflow_id),
+    step_index INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    element TEXT,
+    screen_id TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (workflow_id, step_index)
+);
+CREATE INDEX IF NOT EXISTS workflows_status ON workflows(status, updated_at);
+"""
+
+# Workflow states; only workflows that stopped part way can be resumed
+STATUS_RUNNING = "running"
+STATUS_FAILED = "failed"
+STATUS_COMPLETED = "completed"
+# Stopped before a plan was stored; there is nothing to resume
+STATUS_ABANDONED = "abandoned"
+RESUMABLE_STATUSES = (STATUS_RUNNING, STATUS_FAILED)
+
+
+class CheckpointStore:
+    """SQLite store of creation workflow progress.
+
+    Keeps the generated plan and, per plan step, the outcome, the element that
+    was tapped and the UI map id of the screen it was tapped on, so a failed
+    workflow can continue from its last good step instead of starting over.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def createWorkflow(self, query: str, plan: Dict[str, Any]) -> str:
+        """Store a new workflow with its plan and return its id."""
+        workflow_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO workflows (workflow_id, query, plan, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (workflow_id, query, json.dumps(plan), STATUS_RUNNING, now, now)
+            )
+        return workflow_id
+
+    def setPlan(self, workflow_id: str, plan: Dict[str, Any]) -> None:
+        """Replace the stored plan, e.g. once a streamed plan has finished."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE workflows SET plan = ?, updated_at = ? WHERE workflow_id = ?",
+                (json.dumps(plan), time.time(), workflow_id)
+            )
+
+    def clearSteps(self, workflow_id: str) -> None:
+        """Drop all step checkpoints, e.g. after speculative steps were rolled back."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM steps WHERE workflow_id = ?", (workflow_id,))
+
+    def setStatus(self, workflow_id: str, status: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE workflows SET status = ?, updated_at = ? WHERE workflow_id = ?",
+                (status, time.time(), workflow_id)
+            )
+
+    def recordStep(
+        self,
+        workflow_id: str,
+        step_index: int,
+        description: str,
+        status: str,
+        element: Optional[Dict[str, Any]] = None,
+        screen_id: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Checkpoint the outcome of one plan step (overwrites earlier attempts)."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO steps "
+                "(workflow_id, step_index, description, status, element, screen_id, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    workflow_id, step_index, description, status,
+                    json.dumps(element) if element is not None else None,
+                    screen_id, error, now
+                )
+            )
+            self._conn.execute(
+                "UPDATE workflows SET updated_at = ? WHERE workflow_id = ?",
+                (now, workflow_id)
+            )
+
+    def loadWorkflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Load a workflow with its plan and checkpointed steps."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            step_rows = self._conn.execute(
+                "SELECT * FROM steps WHERE workflow_id = ? ORDER BY step_index", (workflow_id,)
+            ).fetchall()
+        steps = []
+        for step_row in step_rows:
+            step = dict(step_row)
+            step["element"] = json.loads(step["element"]) if step["element"] else None
+            steps.append(step)
+        workflow = dict(row)
+        workflow["plan"] = json.loads(workflow["plan"])
+        workflow["steps"] = steps
+        return workflow
+
+    def latestResumable(self) -> Optional[str]:
+        """Return the id of the most recently updated workflow that did not complete."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT workflow_id FROM workflows WHERE status IN (?, ?) ORDER BY updated_at DESC LIMIT 1",
+                RESUMABLE_STATUSES
+            ).fetchone()
+        return row["workflow_id"] if row is not None else None
+
+
+def nextStepIndex(steps: List[Dict[str, Any]]) -> int:
+    """Index of the first plan step after the leading run of completed checkpoints."""
+    index = 0
+    for step in steps:
+        if step["step_index"] != index or step["status"] != STATUS_COMPLETED:
+            break
+        index += 1
+    return index
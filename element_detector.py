@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import time
+import logging
+from typing import Dict, Any, Optional, List
+
+from element_processing import labelScores
+
+try:
+    import cv2
+except ImportError:  # opencv is optional; without it every lookup goes to Gemini
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+# Minimum normalized correlation for a local match to be trusted
+MIN_CONFIDENCE = 0.9
+# Images are matched at this scale; templates come from the same device so
+# no multi-scale search is needed
+MATCH_SCALE = 0.5
+MAX_TEMPLATES_PER_LABEL = 3
+# Flat crops correlate perfectly with any flat region (TM_CCOEFF_NORMED gives
+# 1.0), so templates need some texture in grayscale standard deviation
+MIN_TEMPLATE_STDDEV = 12.0
+# Only crops whose label answers the description become templates
+MIN_LABEL_MATCH = 0.5
+INDEX_FILE = "index.json"
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or "element"
+
+
+def _normalizeLabel(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class TemplateDetector:
+    """Local CPU detector for recurring Tasker widgets.
+
+    Templates are crops of elements that Gemini located on earlier screenshots,
+    stored in a directory with a JSON index keyed by the description that was
+    looked up. detect() answers a familiar description in a few milliseconds with
+    OpenCV template matching; unknown targets or weak matches return None so the
+    caller can fall back to Gemini.
+    """
+
+    def __init__(self, template_dir: str, min_confidence: float = MIN_CONFIDENCE) -> None:
+        self.template_dir = template_dir
+        self.min_confidence = min_confidence
+        self.index = {}  # type: Dict[str, List[Dict[str, Any]]]
+        self._images = {}  # type: Dict[str, Any]
+        if cv2 is None:
+            logger.info("OpenCV not installed, local element detection disabled")
+            return
+        self._loadIndex()
+
+    @property
+    def available(self) -> bool:
+        """Whether OpenCV is installed and at least one template is known."""
+        return cv2 is not None and bool(self.index)
+
+    def _indexPath(self) -> str:
+        return os.path.join(self.template_dir, INDEX_FILE)
+
+    def _loadIndex(self) -> None:
+        path = self._indexPath()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable template index " + path + ": " + str(e))
+
+    def _saveIndex(self) -> None:
+        os.makedirs(self.template_dir, exist_ok=True)
+        tmp_path = self._indexPath() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self._indexPath())
+
+    def _template(self, file_name: str) -> Any:
+        image = self._images.get(file_name)
+        if image is None:
+            image = cv2.imread(os.path.join(self.template_dir, file_name), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                return None
+            if MATCH_SCALE != 1.0:
+                image = cv2.resize(image, None, fx=MATCH_SCALE, fy=MATCH_SCALE, interpolation=cv2.INTER_AREA)
+            self._images[file_name] = image
+        return image
+
+    def addTemplate(self, image_path: str, element: Dict[str, Any], label: str) -> bool:
+        """Record the crop of a located element as a template for a description.
+
+        Args:
+            image_path: Screenshot the element was found on
+            element: Element with an 'abs_box' in screen pixels
+            label: Description the element answers (e.g. "Add Task button")
+
+        Returns:
+            bool: True if a template was stored; crops whose label does not
+            match the description or that are too uniform are skipped.
+        """
+        if cv2 is None or "abs_box" not in element:
+            return False
+        if labelScores([element], label)[0] < MIN_LABEL_MATCH:
+            logger.info("Not storing template: label " + repr(element.get("label")) + " does not match " + repr(label))
+            return False
+        screen = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if screen is None:
+            return False
+        x1, y1, x2, y2 = [int(v) for v in element["abs_box"]]
+        crop = screen[max(y1, 0):y2, max(x1, 0):x2]
+        if crop.shape[0] < 8 or crop.shape[1] < 8:
+            return False
+        if float(crop.std()) < MIN_TEMPLATE_STDDEV:
+            logger.info("Not storing template for " + repr(label) + ": crop is too uniform")
+            return False
+        os.makedirs(self.template_dir, exist_ok=True)
+        key = _normalizeLabel(label)
+        file_name = _slug(label) + "_" + str(int(time.time() * 1000)) + ".png"
+        cv2.imwrite(os.path.join(self.template_dir, file_name), crop)
+        entries = self.index.setdefault(key, [])
+        entries.append({"file": file_name, "label": element.get("label", label)})
+        while len(entries) > MAX_TEMPLATES_PER_LABEL:
+            stale = entries.pop(0)
+            self._images.pop(stale["file"], None)
+            try:
+                os.remove(os.path.join(self.template_dir, stale["file"]))
+            except OSError:
+                pass
+        self._saveIndex()
+        logger.info("Stored local template for: " + key)
+        return True
+
+    def detect(self, image_path: str, target: str) -> Optional[Dict[str, Any]]:
+        """Locate a familiar element on a screenshot without calling Gemini.
+
+        Args:
+            image_path: Screenshot to search
+            target: Description of the wanted element
+
+        Returns:
+            dict: Element with 'abs_box', 'click_x', 'click_y', 'score' and
+            'source', or None when no template matches confidently.
+        """
+        if cv2 is None:
+            return None
+        entries = self.index.get(_normalizeLabel(target))
+        if not entries:
+            return None
+        screen = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if screen is None:
+            return None
+        if MATCH_SCALE != 1.0:
+            screen = cv2.resize(screen, None, fx=MATCH_SCALE, fy=MATCH_SCALE, interpolation=cv2.INTER_AREA)
+
+        best = None  # type: Optional[Dict[str, Any]]
+        for entry in entries:
+            template = self._template(entry["file"])
+            if template is None or template.shape[0] > screen.shape[0] or template.shape[1] > screen.shape[1]:
+                continue
+            if float(template.std()) < MIN_TEMPLATE_STDDEV:
+                continue
+            scores = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+            _, max_score, _, max_loc = cv2.minMaxLoc(scores)
+            if best is None or max_score > best["score"]:
+                x1 = int(max_loc[0] / MATCH_SCALE)
+                y1 = int(max_loc[1] / MATCH_SCALE)
+                x2 = int((max_loc[0] + template.shape[1]) / MATCH_SCALE)
+                y2 = int((max_loc[1] + template.shape[0]) / MATCH_SCALE)
+                best = {
+                    "label": entry.get("label", target),
+                    "abs_box": [x1, y1, x2, y2],
+                    "click_x": (x1 + x2) // 2,
+                    "click_y": (y1 + y2) // 2,
+                    "score": round(float(max_score), 4),
+                    "source": "local"
+                }
+        if best is None or best["score"] < self.min_confidence:
+            return None
+        return best
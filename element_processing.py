@@ -0,0 +1,179 @@
+import re
+import logging
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Overlap above which two detections are considered the same element
+IOU_THRESHOLD = 0.5
+# Label match decides the ranking; Gemini's order and then box size only break ties
+ORDER_WEIGHT = 0.01
+SIZE_WEIGHT = 0.001
+LABEL_KEYS = ("label", "text", "name", "description")
+WORD_PATTERN = re.compile(r"[a-z0-9]+|\+")
+# Words that describe how to interact with an element rather than which one it is
+STOP_WORDS = frozenset((
+    "a", "an", "the", "tap", "click", "press", "select", "open", "on", "in", "to", "of", "for",
+    "and", "or", "button", "icon", "tab", "field", "option", "item"
+))
+# Spellings of the same widget that Gemini and plans use interchangeably
+SYNONYMS = {"+": "add", "plus": "add"}
+
+
+def _labelOf(element: Dict[str, Any]) -> str:
+    for key in LABEL_KEYS:
+        value = element.get(key)
+        if isinstance(value, str) and value:
+            return value
+    return ""
+
+
+def _words(text: str) -> List[str]:
+    """Whole content words of a label or description, in order."""
+    words = [SYNONYMS.get(word, word) for word in WORD_PATTERN.findall(text.lower())]
+    return [word for word in words if word not in STOP_WORDS]
+
+
+def labelScores(elements: List[Dict[str, Any]], target: Optional[str]) -> np.ndarray:
+    """Score how well each element's label matches a target description (0-1).
+
+    Only whole words count. A label whose content words equal the target's
+    (ignoring words like "tap", "the" or "button") scores 1; otherwise the
+    score is 0.9 x precision x recall of the shared words, so a partial match
+    always stays below an exact one.
+    """
+    scores = np.zeros(len(elements), dtype=np.float32)
+    if not target:
+        return scores
+    target_words = _words(target)
+    if not target_words:
+        return scores
+    target_set = set(target_words)
+    for i, element in enumerate(elements):
+        label_words = _words(_labelOf(element))
+        if not label_words:
+            continue
+        if label_words == target_words:
+            scores[i] = 1.0
+            continue
+        shared = len(set(label_words) & target_set)
+        if shared:
+            scores[i] = 0.9 * (shared / len(set(label_words))) * (shared / len(target_set))
+    return scores
+
+
+def transformBoxes(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Convert normalized [ymin, xmin, ymax, xmax] boxes to clamped absolute [xmin, ymin, xmax, ymax].
+
+    Args:
+        boxes: (N, 4) array of boxes normalized to 0-1000
+        width: Screen width in pixels
+        height: Screen height in pixels
+
+    Returns:
+        np.ndarray: (N, 4) int array of absolute pixel boxes inside the screen.
+    """
+    scale = np.array([width, height, width, height], dtype=np.float64) / 1000.0
+    abs_boxes = boxes[:, [1, 0, 3, 2]].astype(np.float64) * scale
+    abs_boxes = np.floor(abs_boxes)
+    abs_boxes[:, [0, 2]] = np.clip(abs_boxes[:, [0, 2]], 0, width - 1)
+    abs_boxes[:, [1, 3]] = np.clip(abs_boxes[:, [1, 3]], 0, height - 1)
+    return abs_boxes.astype(np.int64)
+
+
+def nonMaxSuppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float = IOU_THRESHOLD) -> np.ndarray:
+    """Greedy non-maximum suppression.
+
+    Args:
+        boxes: (N, 4) array of [xmin, ymin, xmax, ymax]
+        scores: (N,) array, higher is better
+        iou_threshold: Overlap above which the lower scored box is dropped
+
+    Returns:
+        np.ndarray: Indices of the kept boxes, best first.
+    """
+    boxes = boxes.astype(np.float64)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        xx1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        intersection = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        union = areas[best] + areas[rest] - intersection
+        iou = np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def processElements(
+    elements: List[Dict[str, Any]],
+    width: int,
+    height: int,
+    target: Optional[str] = None,
+    iou_threshold: Optional[float] = IOU_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Post-process detected elements in one vectorized pass.
+
+    Transforms every box_2d to absolute coordinates clamped to the screen, adds
+    click centers, removes overlapping duplicates and ranks the survivors by
+    label match against the target; ties keep Gemini's order, then prefer the
+    larger box. Elements without a valid box_2d are appended unranked at the end.
+
+    Args:
+        elements: Elements as returned by Gemini
+        width: Screen width in pixels
+        height: Screen height in pixels
+        target: Optional description of the element being looked for
+        iou_threshold: Overlap for duplicate suppression, None to keep all boxes
+
+    Returns:
+        list: Ranked elements with 'abs_box', 'click_x', 'click_y' and 'score'.
+    """
+    boxed = []
+    unboxed = []
+    for element in elements:
+        box = element.get("box_2d")
+        if isinstance(box, list) and len(box) == 4:
+            boxed.append(element)
+        else:
+            unboxed.append(element)
+    if not boxed:
+        return unboxed
+
+    abs_boxes = transformBoxes(np.array([e["box_2d"] for e in boxed], dtype=np.float64), width, height)
+    centers = np.stack([
+        (abs_boxes[:, 0] + abs_boxes[:, 2]) // 2,
+        (abs_boxes[:, 1] + abs_boxes[:, 3]) // 2
+    ], axis=1)
+    areas = (abs_boxes[:, 2] - abs_boxes[:, 0]) * (abs_boxes[:, 3] - abs_boxes[:, 1])
+    size_scores = np.sqrt(areas / float(width * height))
+    order_scores = 1.0 - np.arange(len(boxed), dtype=np.float64) / len(boxed)
+    scores = labelScores(boxed, target) + ORDER_WEIGHT * order_scores + SIZE_WEIGHT * size_scores
+
+    if iou_threshold is None:
+        order = np.argsort(-scores, kind="stable")
+    else:
+        order = nonMaxSuppression(abs_boxes, scores, iou_threshold)
+    if len(order) < len(boxed):
+        logger.info("Suppressed " + str(len(boxed) - len(order)) + " overlapping detections")
+
+    abs_list = abs_boxes.tolist()
+    center_list = centers.tolist()
+    score_list = scores.tolist()
+    ranked = []
+    for i in order.tolist():
+        element = boxed[i]
+        element["abs_box"] = abs_list[i]
+        element["click_x"] = center_list[i][0]
+        element["click_y"] = center_list[i][1]
+        element["score"] = round(score_list[i], 4)
+        ranked.append(element)
+    return ranked + unboxed
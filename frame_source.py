@@ -0,0 +1,177 @@
+import importlib.util
+import subprocess
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# screenrecord stops itself after this many seconds (Android maximum is 180)
+SCREENRECORD_TIME_LIMIT = 180
+READ_CHUNK_SIZE = 64 * 1024
+RESTART_DELAY = 0.5
+
+
+class FrameRingBuffer:
+    """Bounded, thread-safe buffer of the most recent decoded frames.
+
+    Frames are evicted oldest first once either the frame count or the total
+    byte size limit is exceeded; the newest frame is always kept.
+    """
+
+    def __init__(self, max_frames: int, max_bytes: int) -> None:
+        self.max_frames = max(1, max_frames)
+        self.max_bytes = max_bytes
+        self._frames = deque()  # type: Deque[Tuple[int, float, Any]]
+        self._bytes = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def push(self, frame: Any) -> int:
+        """Store a frame (NumPy array) and return its sequence number."""
+        with self._lock:
+            self._sequence += 1
+            self._frames.append((self._sequence, time.time(), frame))
+            self._bytes += frame.nbytes
+            while len(self._frames) > 1 and (
+                len(self._frames) > self.max_frames or self._bytes > self.max_bytes
+            ):
+                _, _, old = self._frames.popleft()
+                self._bytes -= old.nbytes
+            return self._sequence
+
+    def latest(self) -> Optional[Tuple[int, float, Any]]:
+        """Return (sequence, timestamp, frame) of the newest frame, or None."""
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def snapshot(self) -> List[Tuple[int, float, Any]]:
+        """Return all buffered frames, oldest first."""
+        with self._lock:
+            return list(self._frames)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+
+class FrameSource:
+    """Continuous screen frames from an H.264 stream decoded in the background.
+
+    Runs `adb exec-out screenrecord --output-format=h264 -` (restarted whenever it
+    hits the Android time limit), decodes the stream with PyAV on a daemon thread
+    and keeps the newest frames in a FrameRingBuffer. screenrecord only emits
+    frames when the screen changes, so the newest frame stays current while the
+    stream is alive.
+    """
+
+    def __init__(
+        self,
+        serial: str,
+        max_frames: int = 4,
+        max_bytes: int = 64 * 1024 * 1024,
+        bit_rate: int = 8000000,
+        adb_path: str = "adb"
+    ) -> None:
+        self.serial = serial
+        self.bit_rate = bit_rate
+        self.adb_path = adb_path
+        self.buffer = FrameRingBuffer(max_frames, max_bytes)
+        self._process = None  # type: Optional[subprocess.Popen]
+        self._thread = None  # type: Optional[threading.Thread]
+        self._stop = threading.Event()
+        self._first_frame = threading.Event()
+        self.error = None  # type: Optional[str]
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self, wait_first_frame: float = 5.0) -> bool:
+        """Start streaming and wait up to wait_first_frame seconds for a frame.
+
+        Returns:
+            bool: True once a frame is available, False if the stream could not start.
+        """
+        if self.running:
+            return True
+        if importlib.util.find_spec("av") is None:
+            self.error = "PyAV is not installed"
+            logger.warning("Frame stream unavailable: " + self.error)
+            return False
+        self._stop.clear()
+        self._first_frame.clear()
+        self._thread = threading.Thread(target=self._run, name="frame-source", daemon=True)
+        self._thread.start()
+        if not self._first_frame.wait(wait_first_frame):
+            logger.warning("No frame received from stream within " + str(wait_first_frame) + "s")
+            return False
+        return True
+
+    def stop(self) -> None:
+        """Stop the stream and the decoder thread."""
+        self._stop.set()
+        self._terminateProcess()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def latestFrame(self) -> Optional[Tuple[int, float, Any]]:
+        """Return (sequence, timestamp, RGB array) of the newest frame, or None."""
+        if not self.running:
+            return None
+        return self.buffer.latest()
+
+    def _command(self) -> List[str]:
+        return [
+            self.adb_path, "-s", self.serial, "exec-out", "screenrecord",
+            "--output-format=h264",
+            "--bit-rate", str(self.bit_rate),
+            "--time-limit", str(SCREENRECORD_TIME_LIMIT),
+            "-"
+        ]
+
+    def _terminateProcess(self) -> None:
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _run(self) -> None:
+        import av
+
+        while not self._stop.is_set():
+            try:
+                self._process = subprocess.Popen(
+                    self._command(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+                codec = av.CodecContext.create("h264", "r")
+                stdout = self._process.stdout
+                while not self._stop.is_set():
+                    data = stdout.read1(READ_CHUNK_SIZE) if hasattr(stdout, "read1") else stdout.read(READ_CHUNK_SIZE)
+                    if not data:
+                        break
+                    for packet in codec.parse(data):
+                        for frame in codec.decode(packet):
+                            self.buffer.push(frame.to_ndarray(format="rgb24"))
+                            self._first_frame.set()
+            except Exception as e:
+                self.error = str(e)
+                logger.error("Frame stream failed: " + str(e))
+            finally:
+                self._terminateProcess()
+            if not self._stop.is_set():
+                # screenrecord hit its time limit or the device dropped; restart
+                time.sleep(RESTART_DELAY)
@@ -0,0 +1,245 @@
+import re
+import time
+import logging
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Side of the square grid cells used for coordinate lookup, in pixels
+CELL_SIZE = 128
+# Parsed snapshots kept for recently seen screens
+MAX_SNAPSHOTS = 8
+# Seconds a snapshot is served before the screen is dumped again, for changes
+# too small to alter the fingerprint (a list finishing loading, a toggled switch)
+MAX_SNAPSHOT_AGE = 10.0
+
+BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+class HierarchyNode(NamedTuple):
+    """One view of a uiautomator hierarchy dump."""
+    index: int
+    parent: int
+    depth: int
+    text: str
+    resource_id: str
+    class_name: str
+    content_desc: str
+    package: str
+    bounds: Tuple[int, int, int, int]
+    clickable: bool
+    enabled: bool
+    checked: bool
+    selected: bool
+    scrollable: bool
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        left, top, right, bottom = self.bounds
+        return (left + right) // 2, (top + bottom) // 2
+
+    def contains(self, x: int, y: int) -> bool:
+        left, top, right, bottom = self.bounds
+        return left <= x < right and top <= y < bottom
+
+
+def parseBounds(value: str) -> Tuple[int, int, int, int]:
+    """Parse a uiautomator bounds attribute such as "[0,63][1080,210]"."""
+    match = BOUNDS_PATTERN.match(value or "")
+    if match is None:
+        return 0, 0, 0, 0
+    left, top, right, bottom = (int(v) for v in match.groups())
+    return left, top, right, bottom
+
+
+class HierarchySnapshot:
+    """Indexed, read-only view of one view-hierarchy dump.
+
+    The XML is parsed once into a flat list of HierarchyNode tuples with
+    dictionaries from lower-cased text/content-description, resource-id and
+    class name to node indices, and a grid of CELL_SIZE pixel cells for
+    coordinate lookup, so queries do not walk the tree again.
+    """
+
+    def __init__(self, xml: str, cell_size: int = CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self.nodes = []  # type: List[HierarchyNode]
+        self.by_text = {}  # type: Dict[str, List[int]]
+        self.by_resource_id = {}  # type: Dict[str, List[int]]
+        self.by_class = {}  # type: Dict[str, List[int]]
+        self.grid = {}  # type: Dict[Tuple[int, int], List[int]]
+        self._parse(xml)
+
+    def _parse(self, xml: str) -> None:
+        root = ET.fromstring(xml)
+        # Iterative walk; Tasker lists can nest deeper than is comfortable for recursion
+        stack = [(child, -1, 0) for child in reversed(list(root))]
+        while stack:
+            element, parent, depth = stack.pop()
+            if element.tag != "node":
+                continue
+            attrs = element.attrib
+            node = HierarchyNode(
+                index=len(self.nodes),
+                parent=parent,
+                depth=depth,
+                text=attrs.get("text", ""),
+                resource_id=attrs.get("resource-id", ""),
+                class_name=attrs.get("class", ""),
+                content_desc=attrs.get("content-desc", ""),
+                package=attrs.get("package", ""),
+                bounds=parseBounds(attrs.get("bounds", "")),
+                clickable=attrs.get("clickable") == "true",
+                enabled=attrs.get("enabled") == "true",
+                checked=attrs.get("checked") == "true",
+                selected=attrs.get("selected") == "true",
+                scrollable=attrs.get("scrollable") == "true"
+            )
+            self.nodes.append(node)
+            self._index(node)
+            stack.extend((child, node.index, depth + 1) for child in reversed(list(element)))
+
+    def _index(self, node: HierarchyNode) -> None:
+        for value in {node.text.strip().lower(), node.content_desc.strip().lower()}:
+            if value:
+                self.by_text.setdefault(value, []).append(node.index)
+        if node.resource_id:
+            self.by_resource_id.setdefault(node.resource_id, []).append(node.index)
+        if node.class_name:
+            self.by_class.setdefault(node.class_name, []).append(node.index)
+        left, top, right, bottom = node.bounds
+        if right <= left or bottom <= top:
+            return
+        for cell_x in range(left // self.cell_size, (right - 1) // self.cell_size + 1):
+            for cell_y in range(top // self.cell_size, (bottom - 1) // self.cell_size + 1):
+                self.grid.setdefault((cell_x, cell_y), []).append(node.index)
+
+    def find(
+        self,
+        text: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        class_name: Optional[str] = None,
+        partial: bool = False,
+        clickable: Optional[bool] = None
+    ) -> List[HierarchyNode]:
+        """Nodes matching every given criterion, in document order.
+
+        Args:
+            text: Text or content description, case-insensitive
+            resource_id: Full resource id, e.g. "net.dinglisch.android.taskerm:id/fab"
+            class_name: Full class name, e.g. "android.widget.TextView"
+            partial: Match text as a substring instead of the whole label
+            clickable: Only clickable (True) or non-clickable (False) nodes
+
+        Returns:
+            list: Matching nodes.
+        """
+        candidates = None  # type: Optional[set]
+        if text is not None:
+            wanted = text.strip().lower()
+            if partial:
+                indices = [i for value, ids in self.by_text.items() if wanted in value for i in ids]
+            else:
+                indices = self.by_text.get(wanted, [])
+            candidates = set(indices)
+        for index, key in ((self.by_resource_id, resource_id), (self.by_class, class_name)):
+            if key is None:
+                continue
+            indices = set(index.get(key, []))
+            candidates = indices if candidates is None else candidates & indices
+        if candidates is None:
+            candidates = set(range(len(self.nodes)))
+        nodes = [self.nodes[i] for i in sorted(candidates)]
+        if clickable is not None:
+            nodes = [node for node in nodes if node.clickable == clickable]
+        return nodes
+
+    def nodesAt(self, x: int, y: int) -> List[HierarchyNode]:
+        """Nodes whose bounds contain the point, topmost first.
+
+        Later nodes in document order are children or later siblings, which
+        Android draws above the earlier ones.
+        """
+        cell = self.grid.get((x // self.cell_size, y // self.cell_size), [])
+        return [self.nodes[i] for i in reversed(cell) if self.nodes[i].contains(x, y)]
+
+    def clickableAt(self, x: int, y: int) -> Optional[HierarchyNode]:
+        """The topmost clickable node a tap at the point would hit, if any."""
+        for node in self.nodesAt(x, y):
+            if node.clickable and node.enabled:
+                return node
+        return None
+
+    def parentOf(self, node: HierarchyNode) -> Optional[HierarchyNode]:
+        return self.nodes[node.parent] if node.parent >= 0 else None
+
+    def packages(self) -> List[str]:
+        return sorted({node.package for node in self.nodes if node.package})
+
+
+class HierarchyCache:
+    """Parsed hierarchy snapshots keyed by screen fingerprint.
+
+    A dump is requested and parsed only the first time a fingerprint is seen;
+    later queries for an unchanged screen return the cached snapshot until it
+    is max_age seconds old. The least recently used snapshots are dropped
+    beyond max_snapshots.
+
+    Args:
+        dump: Returns the current hierarchy XML (e.g. device.dump_hierarchy)
+        max_snapshots: Number of screens to keep parsed
+        max_age: Seconds a snapshot is reused; None keeps it until invalidated
+    """
+
+    def __init__(
+        self,
+        dump: Callable[[], str],
+        max_snapshots: int = MAX_SNAPSHOTS,
+        max_age: Optional[float] = MAX_SNAPSHOT_AGE
+    ) -> None:
+        self.dump = dump
+        self.max_snapshots = max_snapshots
+        self.max_age = max_age
+        self._snapshots = OrderedDict()  # type: OrderedDict
+        self.hits = 0
+        self.misses = 0
+        self.parse_seconds = 0.0
+
+    def snapshot(self, fingerprint: str) -> HierarchySnapshot:
+        """Return the snapshot for a screen, dumping and parsing it only on a change."""
+        cached = self._snapshots.get(fingerprint)
+        if cached is not None:
+            snapshot, dumped_at = cached
+            if self.max_age is None or time.time() - dumped_at <= self.max_age:
+                self._snapshots.move_to_end(fingerprint)
+                self.hits += 1
+                return snapshot
+            del self._snapshots[fingerprint]
+        self.misses += 1
+        dumped_at = time.time()
+        xml = self.dump()
+        started = time.time()
+        snapshot = HierarchySnapshot(xml)
+        self.parse_seconds += time.time() - started
+        logger.info("Parsed view hierarchy with " + str(len(snapshot.nodes)) + " nodes")
+        self._snapshots[fingerprint] = (snapshot, dumped_at)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, fingerprint: Optional[str] = None) -> None:
+        """Drop one screen's snapshot, or all of them."""
+        if fingerprint is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(fingerprint, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "snapshots": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "parse_seconds": round(self.parse_seconds, 4)
+        }
@@ -0,0 +1,152 @@
+import re
+import logging
+from typing import Dict, Any, Optional, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+INTENT_CREATE = "create"
+INTENT_TEST = "test"
+INTENT_ANALYZE = "analyze"
+INTENT_RESUME = "resume"
+
+# Keyword rules mirroring the root agent instruction
+INTENT_PATTERNS = {
+    INTENT_CREATE: re.compile(r"\b(create|make|build|set up|setup|add)\b", re.IGNORECASE),
+    INTENT_TEST: re.compile(r"\b(test|verify|check|validate)\b", re.IGNORECASE),
+    INTENT_ANALYZE: re.compile(
+        r"\b(analy[sz]e|look at|examine)\b|what'?s on (the )?screen|what is on (the )?screen",
+        re.IGNORECASE
+    ),
+    INTENT_RESUME: re.compile(r"\b(resume|continue)\b", re.IGNORECASE)
+}
+
+# Questions and discussion are left to the LLM even if they contain a keyword
+QUESTION_PATTERN = re.compile(
+    r"^\s*(how|why|when|can you explain|could you explain|explain|should|is it|does|do you)\b",
+    re.IGNORECASE
+)
+SCREEN_QUESTION_PATTERN = re.compile(r"what'?s on (the )?screen|what is on (the )?screen", re.IGNORECASE)
+# Words that may surround a screen question without asking for anything else
+SCREEN_QUESTION_FILLER_PATTERN = re.compile(r"^[\s?.!,]*(please\s+)?(check|tell me|show me)?[\s?.!,]*$", re.IGNORECASE)
+# "don't create a task yet" must never start a workflow
+NEGATION_PATTERN = re.compile(r"\b(don'?t|do not|not yet|never)\b", re.IGNORECASE)
+# Resume only as the leading command ("continue", "resume the last workflow") or
+# when a workflow is named; "continue explaining the plan" is conversation
+RESUME_COMMAND_PATTERN = re.compile(
+    r"^\s*(please\s+)?(resume|continue)"
+    r"(\s+(the\s+)?((last|previous|failed|interrupted)\s+)?(workflow|run|creation))?\s*[.!]?\s*$",
+    re.IGNORECASE
+)
+WORKFLOW_MENTION_PATTERN = re.compile(r"\bworkflow\b", re.IGNORECASE)
+TEST_PREFIX_PATTERN = re.compile(
+    r"^\s*(please\s+)?(test|verify|check|validate)\s+(the\s+)?(tasker\s+)?(task\s+)?(called\s+|named\s+)?",
+    re.IGNORECASE
+)
+# A create request has to name what is being created
+CREATE_OBJECT_PATTERN = re.compile(
+    r"\b(tasks?|profiles?|automations?|scenes?|actions?|variables?|shortcuts?|routines?)\b",
+    re.IGNORECASE
+)
+# "check whether ..." and "verify that ..." describe a condition, not a task name
+TEST_CLAUSE_PATTERN = re.compile(r"^(whether|if|that)\b", re.IGNORECASE)
+WORKFLOW_ID_PATTERN = re.compile(r"\b([0-9a-f]{32})\b")
+DEFAULT_ANALYSIS_QUERY = "describe all UI elements on screen"
+
+
+def classifyIntent(message: str) -> Optional[Tuple[str, str]]:
+    """Map a user message to a workflow and its argument with keyword rules.
+
+    Args:
+        message: Raw user message
+
+    Returns:
+        tuple: (intent, argument) when exactly one intent matches unambiguously,
+        otherwise None so the message goes to the LLM.
+    """
+    text = message.strip()
+    if not text:
+        return None
+    if NEGATION_PATTERN.search(text):
+        return None
+    if SCREEN_QUESTION_PATTERN.search(text):
+        # "check what's on the screen" is still only a screen question
+        if SCREEN_QUESTION_FILLER_PATTERN.match(SCREEN_QUESTION_PATTERN.sub("", text)):
+            return INTENT_ANALYZE, DEFAULT_ANALYSIS_QUERY
+    elif QUESTION_PATTERN.search(text):
+        return None
+    # Mixed requests such as "analyze the screen and create a task" go to the LLM
+    matches = [i for i, pattern in INTENT_PATTERNS.items() if pattern.search(text)]
+    if len(matches) != 1:
+        return None
+    intent = matches[0]
+
+    if intent == INTENT_CREATE:
+        if CREATE_OBJECT_PATTERN.search(text) is None:
+            return None
+        return intent, text
+    if intent == INTENT_TEST:
+        if TEST_PREFIX_PATTERN.match(text) is None:
+            return None
+        task_name = TEST_PREFIX_PATTERN.sub("", text).strip().strip("\"'.")
+        if not task_name or task_name.lower() in ("it", "this", "that", "the task"):
+            return None
+        if TEST_CLAUSE_PATTERN.match(task_name):
+            return None
+        return intent, task_name
+    if intent == INTENT_ANALYZE:
+        return intent, text
+    workflow_id = WORKFLOW_ID_PATTERN.search(text)
+    if workflow_id is None and RESUME_COMMAND_PATTERN.match(text) is None and WORKFLOW_MENTION_PATTERN.search(text) is None:
+        return None
+    return intent, workflow_id.group(1) if workflow_id else ""
+
+
+def summarizeResult(intent: str, result: Dict[str, Any]) -> str:
+    """Short plain-text report of a workflow result for the chat reply."""
+    status = str(result.get("status", "unknown"))
+    lines = [result.get("workflow", intent) + ": " + status]
+    if result.get("message"):
+        lines.append(str(result["message"]))
+    if result.get("error"):
+        lines.append("Error: " + str(result["error"]))
+    if intent in (INTENT_CREATE, INTENT_RESUME):
+        steps = result.get("steps_completed", [])
+        lines.append("Steps completed: " + str(len(steps)))
+        if result.get("failed_step"):
+            failed = result["failed_step"]
+            lines.append("Failed at step " + str(failed.get("index")) + ": " + str(failed.get("description")))
+        if result.get("workflow_id"):
+            lines.append("Workflow id: " + str(result["workflow_id"]))
+    elif intent == INTENT_TEST:
+        lines.append("Iterations: " + str(len(result.get("iterations", []))))
+    elif intent == INTENT_ANALYZE:
+        lines.append("Analyses performed: " + str(len(result.get("analyses", []))))
+    return "\n".join(lines)
+
+
+def routeMessage(
+    message: str,
+    workflows: Dict[str, Callable[[str], Dict[str, Any]]]
+) -> Optional[Dict[str, Any]]:
+    """Run the workflow for a message directly when its intent is unambiguous.
+
+    Args:
+        message: Raw user message
+        workflows: Intent name -> workflow function taking the routed argument
+
+    Returns:
+        dict: 'intent', 'argument', 'result' and a text 'summary', or None when
+        the message should be handled by the LLM.
+    """
+    classified = classifyIntent(message)
+    if classified is None or classified[0] not in workflows:
+        return None
+    intent, argument = classified
+    logger.info("Intent router: " + intent + " -> " + repr(argument))
+    result = workflows[intent](argument)
+    return {
+        "intent": intent,
+        "argument": argument,
+        "result": result,
+        "summary": summarizeResult(intent, result)
+    }
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Headless job server for batch Tasker provisioning.
+
+Jobs (create / test) are kept in a persistent SQLite queue and executed by a
+worker pool. Usage:
+
+    python job_server.py run spec.json            # enqueue a spec file and process it
+    python job_server.py submit spec.json         # only enqueue
+    python job_server.py serve --port 8765        # HTTP API + workers
+    python job_server.py status                   # queue counts and metrics
+
+A spec file is a JSON list (or JSON lines) of objects such as
+{"kind": "create", "argument": "create a task that ...", "priority": 5}
+with optional "idempotency_key" and "max_attempts".
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Callable
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ("create", "test")
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 5.0
+POLL_INTERVAL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    argument TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    idempotency_key TEXT UNIQUE,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    next_run_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs(status, priority DESC, next_run_at, created_at);
+"""
+
+
+def defaultIdempotencyKey(kind: str, argument: str) -> str:
+    """Content-derived key so resubmitting the same spec does not duplicate jobs."""
+    return hashlib.sha1((kind + "\n" + argument).encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """Persistent priority queue of provisioning jobs backed by SQLite."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def enqueue(
+        self,
+        kind: str,
+        argument: str,
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> Dict[str, Any]:
+        """Add a job unless one with the same idempotency key exists.
+
+        Returns:
+            dict: 'job_id' and 'created' (False when an existing job was returned).
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError("Unknown job kind: " + kind)
+        now = time.time()
+        with self._lock:
+            if idempotency_key is not None:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row is not None:
+                    return {"job_id": row["job_id"], "created": False}
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, argument, priority, idempotency_key, status, max_attempts, created_at, next_run_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, argument, priority, idempotency_key, STATUS_QUEUED, max_attempts, now, now)
+            )
+        return {"job_id": job_id, "created": True}
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the highest priority job that is ready to run."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND next_run_at <= ? "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (STATUS_QUEUED, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ? WHERE job_id = ?",
+                    (STATUS_RUNNING, now, row["job_id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = dict(row)
+        job["attempts"] += 1
+        job["status"] = STATUS_RUNNING
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? WHERE job_id = ?",
+                (STATUS_SUCCEEDED, json.dumps(result, default=str), time.time(), job_id)
+            )
+
+    def linkWorkflow(self, job_id: str, workflow_id: str) -> None:
+        """Record the checkpointed workflow of a running job, so a retry after a
+        crash resumes it instead of starting over."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET result = ? WHERE job_id = ?",
+                (json.dumps({"status": "running", "workflow_id": workflow_id}), job_id)
+            )
+
+    def fail(self, job: Dict[str, Any], error: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a failed attempt; requeue with exponential backoff while attempts remain.
+
+        Without a result (the runner raised) the stored result, e.g. the linked
+        workflow, is kept.
+
+        Returns:
+            bool: True if the job will be retried.
+        """
+        retry = job["attempts"] < job["max_attempts"]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, result = COALESCE(?, result), next_run_at = ?, finished_at = ? WHERE job_id = ?",
+                (
+                    STATUS_QUEUED if retry else STATUS_FAILED,
+                    error,
+                    json.dumps(result, default=str) if result is not None else None,
+                    now + RETRY_BASE_DELAY * (2 ** (job["attempts"] - 1)),
+                    None if retry else now,
+                    job["job_id"]
+                )
+            )
+        return retry
+
+    def requeueInterrupted(self) -> int:
+        """Put jobs left running by a crashed server back in the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, next_run_at = ? WHERE status = ?",
+                (STATUS_QUEUED, time.time(), STATUS_RUNNING)
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def pending(self) -> int:
+        counts = self.counts()
+        return counts.get(STATUS_QUEUED, 0) + counts.get(STATUS_RUNNING, 0)
+
+    def finishedSince(self, since: float) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, started_at, finished_at, attempts FROM jobs WHERE finished_at >= ?", (since,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def runJob(job: Dict[str, Any], on_workflow: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Execute one job with the agent's workflow functions.
+
+    A retried creation job resumes the checkpointed workflow of its previous
+    attempt (failed, interrupted by an error or by a crash) instead of starting
+    over; it starts over only when that workflow never got a plan.
+
+    Args:
+        job: Claimed job
+        on_workflow: Called with the workflow_id as soon as a new workflow exists
+    """
+    from vision_tasker_agent.agent import executeCreationWorkflow, resumeCreationWorkflow, runTestingWorkflow
+
+    if job["kind"] == "test":
+        return runTestingWorkflow(job["argument"])
+    previous = job.get("result") or {}
+    if previous.get("workflow_id") and previous.get("status") != "completed":
+        result = resumeCreationWorkflow(previous["workflow_id"])
+        if "resumed_from_step" in result:
+            return result
+        logger.info("Workflow " + previous["workflow_id"] + " cannot be resumed, starting over")
+    return executeCreationWorkflow(job["argument"], on_workflow)
+
+
+def jobSucceeded(kind: str, result: Dict[str, Any]) -> bool:
+    if kind == "test":
+        return result.get("status") == "passed"
+    return result.get("status") == "completed"
+
+
+class JobServer:
+    """Worker pool draining a JobQueue.
+
+    All workers share one device lock because every job drives the same phone
+    UI, and a job is only claimed once its worker holds the lock; extra
+    workers only help once several devices are configured.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = 1,
+        runner: Callable[[Dict[str, Any], Callable[[str], None]], Dict[str, Any]] = runJob
+    ) -> None:
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.runner = runner
+        self.device_lock = threading.Lock()
+        self.started_at = time.time()
+        self._stop = threading.Event()
+        self._threads = []  # type: List[threading.Thread]
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+
+    def start(self) -> None:
+        requeued = self.queue.requeueInterrupted()
+        if requeued:
+            logger.info("Requeued " + str(requeued) + " interrupted jobs")
+        self.started_at = time.time()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name="job-worker-" + str(i + 1), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def waitUntilIdle(self) -> None:
+        """Block until no job is queued or running (retries included)."""
+        while not self._stop.is_set():
+            with self._busy_lock:
+                busy = self._busy
+            if busy == 0 and self.queue.pending() == 0:
+                return
+            time.sleep(POLL_INTERVAL)
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            # Claim only while holding the device, so a job is "running" (and
+            # counted as an attempt) only once it can actually run, and jobs
+            # submitted meanwhile are still picked by priority
+            if not self.device_lock.acquire(timeout=POLL_INTERVAL):
+                continue
+            try:
+                job = self.queue.claim()
+                if job is not None:
+                    with self._busy_lock:
+                        self._busy += 1
+                    try:
+                        self._execute(job)
+                    finally:
+                        with self._busy_lock:
+                            self._busy -= 1
+            finally:
+                self.device_lock.release()
+            if job is None:
+                time.sleep(POLL_INTERVAL)
+
+    def _execute(self, job: Dict[str, Any]) -> None:
+        logger.info("Job " + job["job_id"] + " (" + job["kind"] + ") attempt " + str(job["attempts"]) + ": " + job["argument"])
+        try:
+            result = self.runner(job, lambda workflow_id: self.queue.linkWorkflow(job["job_id"], workflow_id))
+        except Exception as e:
+            logger.error("Job " + job["job_id"] + " raised: " + str(e))
+            retry = self.queue.fail(job, str(e))
+        else:
+            if jobSucceeded(job["kind"], result):
+                self.queue.complete(job["job_id"], result)
+                logger.info("Job " + job["job_id"] + " succeeded")
+                return
+            retry = self.queue.fail(job, str(result.get("error") or result.get("message") or result.get("status")), result)
+        logger.warning("Job " + job["job_id"] + (" will be retried" if retry else " failed permanently"))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue counts plus throughput and latency of jobs finished since start."""
+        finished = self.queue.finishedSince(self.started_at)
+        elapsed = max(time.time() - self.started_at, 1e-6)
+        durations = [
+            job["finished_at"] - job["started_at"]
+            for job in finished
+            if job["status"] == STATUS_SUCCEEDED and job["started_at"] is not None
+        ]
+        return {
+            "counts": self.queue.counts(),
+            "workers": self.workers,
+            "uptime_s": round(elapsed, 1),
+            "finished": len(finished),
+            "succeeded": sum(1 for job in finished if job["status"] == STATUS_SUCCEEDED),
+            "failed": sum(1 for job in finished if job["status"] == STATUS_FAILED),
+            "retried_attempts": sum(max(job["attempts"] - 1, 0) for job in finished),
+            "throughput_per_min": round(len(finished) / elapsed * 60, 2),
+            "avg_job_s": round(sum(durations) / len(durations), 2) if durations else None
+        }
+
+
+def loadSpec(path: str) -> List[Dict[str, Any]]:
+    """Read a spec file: a JSON list of job objects or one JSON object per line."""
+    with open(path, "r") as f:
+        text = f.read()
+    stripped = text.strip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def enqueueSpec(queue: JobQueue, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Enqueue spec entries, defaulting the idempotency key to the job content."""
+    results = []
+    for spec in specs:
+        kind = spec["kind"]
+        argument = spec["argument"]
+        results.append(queue.enqueue(
+            kind,
+            argument,
+            priority=int(spec.get("priority", 0)),
+            idempotency_key=spec.get("idempotency_key") or defaultIdempotencyKey(kind, argument),
+            max_attempts=int(spec.get("max_attempts", DEFAULT_MAX_ATTEMPTS))
+        ))
+    return results
+
+
+def makeHandler(server: JobServer) -> type:
+    """Build the HTTP request handler bound to a job server."""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Any) -> None:
+            payload = json.dumps(body, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _readJson(self) -> Any:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def do_GET(self) -> None:
+            if self.path == "/metrics":
+                self._send(200, server.metrics())
+            elif self.path.startswith("/jobs/"):
+                job = server.queue.get(self.path[len("/jobs/"):])
+                self._send(200 if job else 404, job or {"error": "Unknown job"})
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def do_POST(self) -> None:
+            try:
+                body = self._readJson()
+                if self.path == "/jobs":
+                    self._send(202, enqueueSpec(server.queue, [body])[0])
+                elif self.path == "/jobs/batch":
+                    self._send(202, {"jobs": enqueueSpec(server.queue, body)})
+                else:
+                    self._send(404, {"error": "Not found"})
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": "Invalid job: " + str(e)})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.info("HTTP " + (format % args))
+
+    return JobRequestHandler
+
+
+def main() -> None:
+    from settings import JOB_DB_PATH, JOB_WORKERS
+
+    parser = argparse.ArgumentParser(description="Batch Tasker provisioning job server")
+    parser.add_argument("--db", default=JOB_DB_PATH, help="SQLite queue path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="enqueue a spec file and process until done")
+    run_parser.add_argument("spec")
+    run_parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    submit_parser = subparsers.add_parser("submit", help="enqueue a spec file")
+    submit_parser.add_argument("spec")
+    serve_parser = subparsers.add_parser("serve", help="run the HTTP API and workers")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    subparsers.add_parser("status", help="print queue counts")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.db)
+    if args.command == "submit":
+        results = enqueueSpec(queue, loadSpec(args.spec))
+        print("Enqueued " + str(sum(1 for r in results if r["created"])) + " new jobs (" + str(len(results)) + " in spec)")
+    elif args.command == "status":
+        print(json.dumps(queue.counts(), indent=2))
+    elif args.command == "run":
+        enqueueSpec(queue, loadSpec(args.spec))
+        server = JobServer(queue, args.workers)
+        server.start()
+        server.waitUntilIdle()
+        server.stop()
+        print(json.dumps(server.metrics(), indent=2))
+    elif args.command == "serve":
+        server = JobServer(queue, args.workers)
+        server.start()
+        httpd = ThreadingHTTPServer((args.host, args.port), makeHandler(server))
+        logger.info("Job server listening on http://" + args.host + ":" + str(args.port))
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+            server.stop()
+
+if __name__ == "__main__":
+    main()
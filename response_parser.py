@@ -0,0 +1,363 @@
+import json
+import re
+import logging
+from typing import Dict, Any, Optional, List, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Markdown code fences Gemini sometimes wraps around JSON output
+CODE_FENCE_PATTERN = re.compile(r"```[a-zA-Z]*")
+TRAILING_COMMA_PATTERN = re.compile(r",(\s*[\]}])")
+# Brackets tried as the start of the document, and repairs tried per bracket
+MAX_START_CANDIDATES = 16
+MAX_REPAIR_CANDIDATES = 8
+_DECODER = json.JSONDecoder()
+
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+
+def validateElement(element: Dict[str, Any]) -> List[str]:
+    """Check a detected UI element against the analyzeImage schema.
+
+    Args:
+        element: Element dict as returned by Gemini
+
+    Returns:
+        list: Human readable problems, empty when the element is valid.
+    """
+    errors = []
+    if not isinstance(element, dict):
+        return ["element is not an object"]
+    if "box_2d" in element:
+        box = element["box_2d"]
+        if not isinstance(box, list) or len(box) != 4:
+            errors.append("box_2d must be a list of 4 numbers")
+        elif not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in box):
+            errors.append("box_2d values must be numbers")
+        else:
+            if not all(0 <= v <= 1000 for v in box):
+                errors.append("box_2d values must be normalized to 0-1000")
+            if box[0] > box[2] or box[1] > box[3]:
+                errors.append("box_2d must be ordered [ymin, xmin, ymax, xmax]")
+    for key in ("label", "text", "type"):
+        if key in element and element[key] is not None and not isinstance(element[key], str):
+            errors.append(key + " must be a string")
+    return errors
+
+
+def validateStep(step: Dict[str, Any]) -> List[str]:
+    """Check a plan step against the generatePlan schema.
+
+    Args:
+        step: Step dict as returned by Gemini
+
+    Returns:
+        list: Human readable problems, empty when the step is valid.
+    """
+    errors = []
+    if not isinstance(step, dict):
+        return ["step is not an object"]
+    step_number = step.get("step_number")
+    if isinstance(step_number, bool) or not isinstance(step_number, int) or step_number < 1:
+        errors.append("step_number must be a positive integer")
+    action = step.get("action")
+    if not isinstance(action, str) or not action.strip():
+        errors.append("action must be a non-empty string")
+    for key in ("ui_element", "description", "input_text"):
+        if key in step and step[key] is not None and not isinstance(step[key], str):
+            errors.append(key + " must be a string")
+    return errors
+
+
+def _isDocument(value: Any) -> bool:
+    """Whether a parsed value looks like a response document rather than a stray bracket."""
+    if isinstance(value, list):
+        return not value or any(isinstance(v, dict) for v in value)
+    return isinstance(value, dict)
+
+
+def _parsesAt(text: str, start: int) -> bool:
+    """Whether a JSON document (possibly truncated) begins at start."""
+    try:
+        value, _ = _DECODER.raw_decode(text, start)
+        return _isDocument(value)
+    except json.JSONDecodeError:
+        pass
+    for candidate in _closeTruncated(text[start:])[:MAX_REPAIR_CANDIDATES]:
+        try:
+            return _isDocument(json.loads(TRAILING_COMMA_PATTERN.sub(r"\1", candidate)))
+        except json.JSONDecodeError:
+            continue
+    return False
+
+
+def stripCodeFences(text: str) -> str:
+    """Remove markdown code fences and any prose before the first JSON value.
+
+    Prose may itself contain brackets ("Here [is] the plan: {...}"), so the
+    first "{" or "[" that begins a parseable document wins; the first bracket
+    is only used when none does.
+    """
+    text = CODE_FENCE_PATTERN.sub("", text)
+    starts = [i for i, ch in enumerate(text) if ch in "{["]
+    if not starts:
+        return text.strip()
+    for start in starts[:MAX_START_CANDIDATES]:
+        if _parsesAt(text, start):
+            return text[start:].strip()
+    return text[starts[0]:].strip()
+
+
+def _closeTruncated(text: str) -> List[str]:
+    """Build candidate documents that close a truncated JSON value.
+
+    The first candidate closes the text as-is; later ones cut back to earlier
+    value boundaries so a half-written trailing member is dropped.
+    """
+    stack = []  # type: List[str]
+    in_string = False
+    escape = False
+    boundaries = []  # type: List[Tuple[int, List[str]]]
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            boundaries.append((i + 1, list(stack)))
+        elif ch == ",":
+            boundaries.append((i, list(stack)))
+
+    candidates = []
+    tail = text
+    if in_string:
+        tail = tail + '"'
+    candidates.append(tail + "".join(reversed(stack)))
+    for end, open_stack in reversed(boundaries):
+        candidates.append(text[:end] + "".join(reversed(open_stack)))
+    return candidates
+
+
+def repairJson(text: str) -> Any:
+    """Parse model output that is almost, but not quite, valid JSON.
+
+    Handles code fences, leading prose, trailing commas and truncated tails.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        The parsed JSON value.
+
+    Raises:
+        json.JSONDecodeError: If the text cannot be repaired.
+    """
+    cleaned = stripCodeFences(text)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        first_error = e
+    cleaned = TRAILING_COMMA_PATTERN.sub(r"\1", cleaned)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+    for candidate in _closeTruncated(cleaned):
+        candidate = TRAILING_COMMA_PATTERN.sub(r"\1", candidate)
+        try:
+            value = json.loads(candidate)
+            logger.warning("Repaired truncated JSON response")
+            return value
+        except json.JSONDecodeError:
+            continue
+    raise first_error
+
+
+class StreamingJsonParser:
+    """Incrementally extract the items of one array from streamed JSON.
+
+    Feed the model output chunk by chunk; every object inside the target array
+    (e.g. "elements" or "steps") is returned from feed() as soon as its closing
+    brace arrives. A bare top-level array is accepted as the target as well.
+    """
+
+    def __init__(self, array_key: str, validator: Optional[Validator] = None) -> None:
+        self.array_key = array_key
+        self.validator = validator
+        self.items = []  # type: List[Dict[str, Any]]
+        self.errors = []  # type: List[Dict[str, Any]]
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None  # type: Optional[int]
+        self._array_closed = False
+        self._seen_object = False
+        self._item_start = None  # type: Optional[int]
+        self._key_pattern = re.compile('"' + re.escape(array_key) + r'"\s*:\s*$')
+
+    @property
+    def text(self) -> str:
+        """Raw text received so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of model output.
+
+        Args:
+            chunk: Next piece of streamed text
+
+        Returns:
+            list: Items completed by this chunk that passed validation.
+        """
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._isTargetOpen(ch, i):
+                    self._array_depth = self._depth
+                    self._array_closed = False
+                elif self._inTargetArray() and ch == "{" and self._depth == self._array_depth + 1:
+                    self._item_start = i
+                if ch == "{":
+                    self._seen_object = True
+                self._depth += 1
+            elif ch in "}]":
+                self._depth = max(self._depth - 1, 0)
+                if not self._inTargetArray():
+                    continue
+                if ch == "}" and self._item_start is not None and self._depth == self._array_depth + 1:
+                    item = self._acceptItem(buffer[self._item_start:i + 1])
+                    self._item_start = None
+                    if item is not None:
+                        completed.append(item)
+                elif ch == "]" and self._depth == self._array_depth:
+                    self._array_closed = True
+        self._pos = len(buffer)
+        return completed
+
+    def finish(self) -> Any:
+        """Parse the complete (possibly damaged) document.
+
+        Returns:
+            The repaired document with the target array replaced by the validated
+            items, or a dict holding just the items when the document is beyond
+            repair. Returns None when nothing usable was received. Target
+            entries that are not objects are recorded in errors.
+        """
+        try:
+            document = repairJson(self._buffer)
+        except json.JSONDecodeError:
+            document = None
+        if isinstance(document, list) and self._array_depth == 0:
+            self._rejectNonObjects(document)
+            return self.items
+        if isinstance(document, dict):
+            if self.array_key in document:
+                self._rejectNonObjects(document[self.array_key])
+            if self.array_key in document or self.items:
+                document[self.array_key] = self.items
+            return document
+        if self.items:
+            return {self.array_key: self.items}
+        return document
+
+    def _inTargetArray(self) -> bool:
+        return self._array_depth is not None and not self._array_closed
+
+    def _isTargetOpen(self, ch: str, index: int) -> bool:
+        if ch != "[":
+            return False
+        # A bracket in leading prose ("Here [is] the plan") may have been taken
+        # for a bare array; give it up if it closed without any items
+        if self._array_depth is not None and not (self._array_closed and not self.items):
+            return False
+        if self._depth == 0:
+            return not self._seen_object
+        window = self._buffer[max(0, index - len(self.array_key) - 64):index]
+        return self._key_pattern.search(window) is not None
+
+    def _rejectNonObjects(self, target: Any) -> None:
+        """Record target entries that are not objects; feed() only emits objects."""
+        if not isinstance(target, list):
+            self.errors.append({"item": target, "errors": ["'" + self.array_key + "' is not an array"]})
+            return
+        for entry in target:
+            if not isinstance(entry, dict):
+                self.errors.append({"item": entry, "errors": ["not an object"]})
+
+    def _acceptItem(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                item = repairJson(text)
+            except json.JSONDecodeError as e:
+                self.errors.append({"raw": text, "errors": ["unparseable: " + str(e)]})
+                return None
+        if not isinstance(item, dict):
+            self.errors.append({"item": item, "errors": ["not an object"]})
+            return None
+        if self.validator is not None:
+            problems = self.validator(item)
+            if problems:
+                logger.warning("Dropping invalid " + self.array_key + " item: " + "; ".join(problems))
+                self.errors.append({"item": item, "errors": problems})
+                return None
+        self.items.append(item)
+        return item
+
+
+def parseStream(
+    chunks: Iterable[str],
+    array_key: str,
+    validator: Optional[Validator] = None,
+    on_item: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """Run a StreamingJsonParser over an iterable of text chunks.
+
+    Args:
+        chunks: Streamed model output
+        array_key: Name of the array whose items should be emitted
+        validator: Optional schema check applied to every item
+        on_item: Optional callback invoked with each item as soon as it is complete
+
+    Returns:
+        dict: 'document' (repaired JSON or None), 'items', 'errors' and 'raw_text'.
+    """
+    parser = StreamingJsonParser(array_key, validator)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        for item in parser.feed(chunk):
+            if on_item is not None:
+                on_item(item)
+    return {
+        "document": parser.finish(),
+        "items": parser.items,
+        "errors": parser.errors,
+        "raw_text": parser.text
+    }
@@ -0,0 +1,48 @@
+import os
+from typing import Any
+
+import config
+
+# config.py is the user's own copy of config.py.example. Options added to the
+# example after it was copied are read with the same environment defaults
+# here, so an older config.py keeps working without edits.
+
+
+def _setting(name: str, default: Any) -> Any:
+    return getattr(config, name, default)
+
+
+def _flag(name: str, default: str) -> bool:
+    return _setting(name, os.getenv(name, default).lower() == "true")
+
+
+GOOGLE_API_KEY = config.GOOGLE_API_KEY
+DEVICE_SERIAL = config.DEVICE_SERIAL
+DEVICE_WIDTH = config.DEVICE_WIDTH
+DEVICE_HEIGHT = config.DEVICE_HEIGHT
+TASKER_PACKAGE_NAME = _setting("TASKER_PACKAGE_NAME", os.getenv("TASKER_PACKAGE_NAME", "net.dinglisch.android.taskerm"))
+
+UI_MAP_PATH = _setting("UI_MAP_PATH", os.getenv("UI_MAP_PATH", "tasker_ui_map.json"))
+TEMPLATE_DIR = _setting("TEMPLATE_DIR", os.getenv("TEMPLATE_DIR", "element_templates"))
+CHECKPOINT_DB_PATH = _setting("CHECKPOINT_DB_PATH", os.getenv("CHECKPOINT_DB_PATH", "workflow_checkpoints.db"))
+ARTIFACT_DIR = _setting("ARTIFACT_DIR", os.getenv("ARTIFACT_DIR", "artifacts"))
+JOB_DB_PATH = _setting("JOB_DB_PATH", os.getenv("JOB_DB_PATH", "jobs.db"))
+JOB_WORKERS = _setting("JOB_WORKERS", int(os.getenv("JOB_WORKERS", 1)))
+FRAME_SOURCE = _setting("FRAME_SOURCE", os.getenv("FRAME_SOURCE", "screenshot"))
+FRAME_BUFFER_FRAMES = _setting("FRAME_BUFFER_FRAMES", int(os.getenv("FRAME_BUFFER_FRAMES", 4)))
+FRAME_BUFFER_MAX_MB = _setting("FRAME_BUFFER_MAX_MB", int(os.getenv("FRAME_BUFFER_MAX_MB", 64)))
+ADB_KEYBOARD = _flag("ADB_KEYBOARD", "false")
+INTENT_ROUTER = _flag("INTENT_ROUTER", "true")
+SPECULATIVE_EXECUTION = _flag("SPECULATIVE_EXECUTION", "true")
+
+
+def validateConfig() -> None:
+    """Check the credentials; an older config.py already did this at import time."""
+    validate = getattr(config, "validateConfig", None)
+    if validate is not None:
+        validate()
+        return
+    if not GOOGLE_API_KEY:
+        raise ValueError("GOOGLE_API_KEY environment variable is required")
+    if not DEVICE_SERIAL:
+        raise ValueError("DEVICE_SERIAL environment variable is required")
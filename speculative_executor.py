@@ -0,0 +1,137 @@
+import queue
+import re
+import threading
+import logging
+from typing import Dict, Any, Optional, List, Callable
+
+logger = logging.getLogger(__name__)
+
+# Steps that only move around Tasker's UI and are undone by going back
+SAFE_STEP_PATTERN = re.compile(
+    r"\b(open|launch|start|go to|navigate|tap|click|press|select|switch to)\b.*"
+    r"(\b(tasker|tasks?|profiles?|scenes?|vars?|variables?|tab|plus|add|new|menu)\b|\+)"
+    r"|^\s*(\+|plus\b|add\b)",
+    re.IGNORECASE
+)
+# Anything that commits, deletes or types must wait for the full plan
+UNSAFE_STEP_PATTERN = re.compile(
+    r"\b(delete|remove|save|confirm|ok|done|apply|accept|enter|type|input|name|set|rename|import|export|run|test|enable|disable)\b",
+    re.IGNORECASE
+)
+
+_END = object()
+
+
+def isSafeStep(step: Dict[str, Any]) -> bool:
+    """Whether a plan step may be executed before the rest of the plan is known."""
+    if step.get("input_text"):
+        return False
+    text = " ".join(str(step.get(key, "")) for key in ("action", "ui_element", "description"))
+    return SAFE_STEP_PATTERN.search(text) is not None and UNSAFE_STEP_PATTERN.search(text) is None
+
+
+def planConfirms(plan_result: Dict[str, Any], executed: List[Dict[str, Any]]) -> bool:
+    """Check that the final plan still starts with the steps executed speculatively."""
+    if not executed:
+        return True
+    if not plan_result.get("success") or plan_result.get("raw_response"):
+        return False
+    plan = plan_result.get("plan")
+    steps = plan.get("steps", []) if isinstance(plan, dict) else []
+    if len(steps) < len(executed):
+        return False
+    for index, step in enumerate(executed):
+        if steps[index] != step:
+            return False
+    for invalid in plan_result.get("invalid_steps", []):
+        item = invalid.get("item")
+        number = item.get("step_number") if isinstance(item, dict) else None
+        if not isinstance(number, int) or number <= len(executed):
+            return False
+    return True
+
+
+class SpeculativePlanRunner:
+    """Execute the leading safe steps of a plan while it is still being generated.
+
+    The plan is generated on a background thread; every step is handed over as
+    soon as the streaming parser completes it. Leading steps that pass isSafeStep
+    run immediately on the device. Speculation stops at the first unsafe or
+    failed step. When the finished plan does not confirm the executed prefix
+    (generation failed, steps were renumbered or rejected), rollback() is called
+    and the caller starts from the first step again.
+
+    Args:
+        generate: Plan generator taking a per-step callback (e.g. tools.streamPlan)
+        execute_step: Runs one step given its index; returns True on success
+        rollback: Undoes the given executed steps
+        is_safe: Predicate deciding which steps may run early
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[Callable[[Dict[str, Any]], None]], Dict[str, Any]],
+        execute_step: Callable[[int, Dict[str, Any]], bool],
+        rollback: Callable[[List[Dict[str, Any]]], None],
+        is_safe: Callable[[Dict[str, Any]], bool] = isSafeStep
+    ) -> None:
+        self.generate = generate
+        self.execute_step = execute_step
+        self.rollback = rollback
+        self.is_safe = is_safe
+        self._steps = queue.Queue()  # type: queue.Queue
+        self._plan_result = None  # type: Optional[Dict[str, Any]]
+
+    def _generate(self) -> None:
+        try:
+            self._plan_result = self.generate(self._steps.put)
+        except Exception as e:
+            logger.error("Streamed plan generation failed: " + str(e))
+            self._plan_result = {"success": False, "error": str(e)}
+        finally:
+            self._steps.put(_END)
+
+    def run(self) -> Dict[str, Any]:
+        """Generate the plan and speculatively execute its safe prefix.
+
+        Returns:
+            dict: 'plan_result', 'executed' (number of steps that ran and were
+            kept), 'speculated' (number that ran before the plan finished) and
+            'rolled_back'.
+        """
+        thread = threading.Thread(target=self._generate, name="plan-stream", daemon=True)
+        thread.start()
+
+        executed = []  # type: List[Dict[str, Any]]
+        speculating = True
+        while True:
+            step = self._steps.get()
+            if step is _END:
+                break
+            if not speculating:
+                continue
+            if not self.is_safe(step):
+                logger.info("Speculation stops before unsafe step: " + str(step.get("action")))
+                speculating = False
+                continue
+            logger.info("Speculatively executing step " + str(len(executed) + 1) + ": " + str(step.get("action")))
+            if not self.execute_step(len(executed), step):
+                speculating = False
+                continue
+            executed.append(step)
+        thread.join()
+
+        plan_result = self._plan_result or {"success": False, "error": "No plan generated"}
+        rolled_back = False
+        speculated = len(executed)
+        if executed and not planConfirms(plan_result, executed):
+            logger.warning("Final plan does not confirm " + str(len(executed)) + " speculative steps, rolling back")
+            self.rollback(executed)
+            rolled_back = True
+            executed = []
+        return {
+            "plan_result": plan_result,
+            "executed": len(executed),
+            "speculated": speculated,
+            "rolled_back": rolled_back
+        }
@@ -0,0 +1,57 @@
+from app_state import LAUNCH_TIMEOUT, AppStateTracker
+
+PACKAGE = "net.dinglisch.android.taskerm"
+
+
+class FakeDevice:
+    def __init__(self, foreground):
+        self.foreground = foreground
+        self.calls = []
+
+    def app_current(self):
+        self.calls.append("app_current")
+        return {"package": self.foreground, "activity": ".Main"}
+
+    def app_start(self, package):
+        self.calls.append("app_start")
+        self.started = package
+
+    def app_wait(self, package, front=False, timeout=None):
+        self.calls.append("app_wait")
+        self.wait_args = (package, front, timeout)
+        self.foreground = package
+        return True
+
+
+def testDoesNotLaunchWhenTaskerIsInFront():
+    device = FakeDevice(PACKAGE)
+    launches = []
+    tracker = AppStateTracker(device, PACKAGE, on_launch=lambda: launches.append(1))
+    assert not tracker.ensureForeground()
+    assert device.calls == ["app_current"]
+    assert launches == []
+    assert tracker.stats() == {"package": PACKAGE, "launches": 0, "foreground_checks": 1}
+
+
+def testLaunchesWaitsThenNotifies():
+    device = FakeDevice("com.google.android.apps.nexuslauncher")
+    tracker = AppStateTracker(device, PACKAGE, on_launch=lambda: device.calls.append("on_launch"))
+    assert tracker.ensureForeground()
+    assert device.calls == ["app_current", "app_start", "app_wait", "on_launch"]
+    assert device.started == PACKAGE
+    assert device.wait_args == (PACKAGE, True, LAUNCH_TIMEOUT)
+    assert tracker.launches == 1
+    assert not tracker.ensureForeground()
+    assert tracker.launches == 1
+
+
+def testUnreadableForegroundCountsAsNotInFront():
+    device = FakeDevice(PACKAGE)
+
+    def fail():
+        raise RuntimeError("agent died")
+
+    device.app_current = fail
+    tracker = AppStateTracker(device, PACKAGE)
+    assert tracker.foreground() == {}
+    assert tracker.ensureForeground()
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+
+from artifact_store import ArtifactStore, selectPath, summarizeAnalysis, summarizePlan
+
+ANALYSIS = {"elements": [{"label": "Add", "click_x": 970, "click_y": 2270}, {"text": "Tasks"}, {"name": ""}]}
+
+
+def testPutGetRoundTrip(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    artifact_id = store.put("analysis", ANALYSIS)
+    assert artifact_id.startswith("analysis-")
+    record = store.get(artifact_id)
+    assert record["kind"] == "analysis"
+    assert record["data"] == ANALYSIS
+    assert store.list() == [artifact_id]
+    assert store.get("analysis-missing") is None
+    # Ids are file names inside the store only
+    assert store.get("../" + artifact_id) == record
+
+
+def testPruneRemovesOldestArtifactsAndCopiedFiles(tmp_path):
+    screenshot = tmp_path / "screen.png"
+    screenshot.write_bytes(b"png")
+    store = ArtifactStore(str(tmp_path / "artifacts"), max_artifacts=2)
+    first = store.putFile("screenshot", str(screenshot))
+    copied = store.get(first)["data"]["file"]
+    assert os.path.exists(copied) and copied != str(screenshot)
+    kept = []
+    for i in range(2):
+        time.sleep(0.01)
+        kept.append(store.put("plan", {"steps": [i]}))
+    assert store.list() == kept
+    assert store.get(first) is None
+    assert not os.path.exists(copied)
+    assert screenshot.exists()
+
+
+def testSelectPath():
+    data = {"elements": [{"label": "Add"}], "count": 1}
+    assert selectPath(data, "elements.0.label") == "Add"
+    assert selectPath(data, "") == data
+    for path in ("elements.1", "elements.x", "missing", "count.0", "elements.0.label.x"):
+        with pytest.raises(KeyError):
+            selectPath(data, path)
+
+
+def testSummarizeAnalysis():
+    summary = summarizeAnalysis({"success": True, "analysis": dict(ANALYSIS, description="x" * 300)})
+    assert summary["element_count"] == 3
+    assert summary["top_elements"] == [
+        {"label": "Add", "click_x": 970, "click_y": 2270},
+        {"label": "Tasks", "click_x": None, "click_y": None}
+    ]
+    assert len(summary["description"]) == 200
+    assert summarizeAnalysis({"success": False, "error": "quota"}) == {"success": False, "error": "quota"}
+    assert summarizeAnalysis({"success": True, "analysis": "raw text"})["element_count"] == 0
+
+
+def testSummarizePlan():
+    steps = [{"action": "Open Tasker"}, {"action": "a" * 80}, "bad"]
+    summary = summarizePlan({"success": True, "plan": {"steps": steps}})
+    assert summary == {"success": True, "step_count": 3, "actions": ["Open Tasker", "a" * 60]}
+    assert summarizePlan({"success": False, "error": "quota"}) == {"success": False, "error": "quota"}
+    raw = summarizePlan({"success": True, "plan": "1. Open Tasker", "raw_response": True})
+    assert raw == {"success": True, "step_count": 0, "actions": [], "raw_response": True}
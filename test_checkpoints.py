@@ -0,0 +1,89 @@
+import sys
+import types
+
+from checkpoints import STATUS_ABANDONED, STATUS_COMPLETED, STATUS_FAILED, CheckpointStore, nextStepIndex
+
+PLAN = {"steps": [{"action": "Open Tasker"}, {"action": "Tasks tab"}, {"action": "+"}]}
+
+
+def testWorkflowRoundTrip(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    workflow_id = store.createWorkflow("create a task", PLAN)
+    store.recordStep(workflow_id, 0, "Open Tasker", STATUS_COMPLETED, element={"click_x": 1}, screen_id="s0")
+    workflow = store.loadWorkflow(workflow_id)
+    assert workflow["query"] == "create a task"
+    assert workflow["plan"] == PLAN
+    assert workflow["status"] == "running"
+    assert workflow["steps"][0]["element"] == {"click_x": 1}
+    assert workflow["steps"][0]["screen_id"] == "s0"
+    assert store.loadWorkflow("missing") is None
+
+
+def testRecordStepOverwritesEarlierAttempt(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    workflow_id = store.createWorkflow("q", PLAN)
+    store.recordStep(workflow_id, 0, "Open Tasker", STATUS_FAILED, error="boom")
+    store.recordStep(workflow_id, 0, "Open Tasker", STATUS_COMPLETED)
+    steps = store.loadWorkflow(workflow_id)["steps"]
+    assert len(steps) == 1
+    assert steps[0]["status"] == STATUS_COMPLETED
+
+
+def testSetPlanAndClearSteps(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    workflow_id = store.createWorkflow("q", {"steps": []})
+    store.recordStep(workflow_id, 0, "Open Tasker", STATUS_COMPLETED)
+    store.setPlan(workflow_id, PLAN)
+    store.clearSteps(workflow_id)
+    workflow = store.loadWorkflow(workflow_id)
+    assert workflow["plan"] == PLAN
+    assert workflow["steps"] == []
+
+
+def testLatestResumableSkipsCompletedWorkflows(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    failed = store.createWorkflow("first", PLAN)
+    store.setStatus(failed, STATUS_FAILED)
+    done = store.createWorkflow("second", PLAN)
+    store.setStatus(done, STATUS_COMPLETED)
+    assert store.latestResumable() == failed
+    store.setStatus(failed, STATUS_COMPLETED)
+    assert store.latestResumable() is None
+
+
+def testNextStepIndex():
+    def step(index, status):
+        return {"step_index": index, "status": status}
+
+    assert nextStepIndex([]) == 0
+    assert nextStepIndex([step(0, STATUS_COMPLETED), step(1, STATUS_COMPLETED)]) == 2
+    assert nextStepIndex([step(0, STATUS_COMPLETED), step(1, STATUS_FAILED), step(2, STATUS_COMPLETED)]) == 1
+    assert nextStepIndex([step(0, STATUS_COMPLETED), step(2, STATUS_COMPLETED)]) == 1
+
+
+def testAbandonedWorkflowDoesNotHideResumableOne(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    failed = store.createWorkflow("first", PLAN)
+    store.setStatus(failed, STATUS_FAILED)
+    planless = store.createWorkflow("second", {"steps": []})
+    store.setStatus(planless, STATUS_ABANDONED)
+    assert store.latestResumable() == failed
+
+
+def testPlanFailureAbandonsWorkflow(tmp_path, monkeypatch):
+    from vision_tasker_agent import agent
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    failed = store.createWorkflow("first", PLAN)
+    store.setStatus(failed, STATUS_FAILED)
+    settings = types.ModuleType("settings")
+    settings.SPECULATIVE_EXECUTION = False
+    tools = types.ModuleType("tools")
+    tools.generatePlan = lambda query: {"success": False, "error": "quota"}
+    monkeypatch.setitem(sys.modules, "settings", settings)
+    monkeypatch.setitem(sys.modules, "tools", tools)
+    monkeypatch.setattr(agent, "getCheckpointStore", lambda: store)
+    monkeypatch.setattr(agent, "_storePlan", lambda plan_result: plan_result)
+    result = agent.runCreationWorkflow("create a task")
+    assert result["status"] == "failed"
+    assert "workflow_id" not in result
+    assert store.latestResumable() == failed
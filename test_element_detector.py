@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from element_detector import TemplateDetector
+
+BOX = [200, 400, 296, 496]
+
+
+def writeScreen(path, seed, with_button=True):
+    """Plain grey screen, optionally with a textured button at BOX."""
+    screen = np.full((1200, 600), 200, dtype=np.uint8)
+    screen[100:160, 40:560] = 120  # flat toolbar
+    if with_button:
+        button = np.random.RandomState(seed).randint(0, 255, (96, 96)).astype(np.uint8)
+        button = cv2.resize(cv2.resize(button, (12, 12)), (96, 96), interpolation=cv2.INTER_NEAREST)
+        x1, y1, x2, y2 = BOX
+        screen[y1:y2, x1:x2] = button
+    cv2.imwrite(str(path), screen)
+    return str(path)
+
+
+def testAddedTemplateIsDetectedAgain(tmp_path):
+    detector = TemplateDetector(str(tmp_path / "templates"))
+    screen = writeScreen(tmp_path / "screen.png", seed=1)
+    assert detector.addTemplate(screen, {"label": "Add", "abs_box": BOX}, "Add button")
+    found = TemplateDetector(str(tmp_path / "templates")).detect(screen, "add button")
+    assert found is not None
+    assert found["source"] == "local"
+    assert found["score"] > 0.99
+    assert abs(found["click_x"] - 248) <= 2
+    assert abs(found["click_y"] - 448) <= 2
+
+
+def testFlatCropIsRejected(tmp_path):
+    detector = TemplateDetector(str(tmp_path / "templates"))
+    screen = writeScreen(tmp_path / "screen.png", seed=1)
+    assert not detector.addTemplate(screen, {"label": "Tasks", "abs_box": [100, 100, 300, 160]}, "Tasks")
+    assert detector.index == {}
+
+
+def testMismatchedLabelIsRejected(tmp_path):
+    detector = TemplateDetector(str(tmp_path / "templates"))
+    screen = writeScreen(tmp_path / "screen.png", seed=1)
+    assert not detector.addTemplate(screen, {"label": "Cancel", "abs_box": BOX}, "Add button")
+    assert detector.index == {}
+
+
+def testWeakMatchReturnsNone(tmp_path):
+    detector = TemplateDetector(str(tmp_path / "templates"))
+    assert detector.addTemplate(writeScreen(tmp_path / "screen.png", seed=1), {"label": "Add", "abs_box": BOX}, "Add")
+    other = writeScreen(tmp_path / "other.png", seed=2)
+    assert detector.detect(other, "Add") is None
+    assert detector.detect(writeScreen(tmp_path / "empty.png", seed=1, with_button=False), "Add") is None
+    assert detector.detect(other, "Delete") is None
@@ -0,0 +1,73 @@
+import numpy as np
+
+from element_processing import labelScores, nonMaxSuppression, processElements, transformBoxes
+
+WIDTH = 1080
+HEIGHT = 2400
+
+
+def labels(elements):
+    return [element["label"] for element in elements]
+
+
+def testTransformBoxesConvertsAndClamps():
+    boxes = np.array([[100, 200, 300, 400], [-10, 900, 1200, 1100]], dtype=np.float64)
+    assert transformBoxes(boxes, 1000, 2000).tolist() == [[200, 200, 400, 600], [900, 0, 999, 1999]]
+
+
+def testNonMaxSuppressionKeepsBestOfOverlapping():
+    boxes = np.array([[0, 0, 100, 100], [5, 5, 105, 105], [500, 500, 600, 600]])
+    keep = nonMaxSuppression(boxes, np.array([0.5, 0.9, 0.1]), 0.5)
+    assert keep.tolist() == [1, 2]
+
+
+def testLabelScoresMatchWholeWordsOnly():
+    elements = [{"label": "Cancel"}, {"label": "a"}, {"label": "On"}, {"label": "Cancel all"}]
+    scores = labelScores(elements, "Tap the Cancel button")
+    assert scores[0] == 1.0
+    assert scores[1] == 0.0
+    assert scores[2] == 0.0
+    assert 0.0 < scores[3] < 1.0
+
+
+def testExactLabelBeatsFullScreenContainer():
+    elements = [
+        {"label": "a", "box_2d": [0, 0, 1000, 1000]},
+        {"label": "Cancel", "box_2d": [800, 100, 850, 300]}
+    ]
+    assert labels(processElements(elements, WIDTH, HEIGHT, "Cancel")) == ["Cancel", "a"]
+
+
+def testSubstringOfTargetWordDoesNotMatch():
+    elements = [
+        {"label": "On", "box_2d": [100, 700, 150, 900]},
+        {"label": "Add task", "box_2d": [800, 100, 850, 300]}
+    ]
+    ranked = processElements(elements, WIDTH, HEIGHT, "Tap the Add Task button")
+    assert labels(ranked) == ["Add task", "On"]
+    assert ranked[0]["score"] - ranked[1]["score"] > 0.9
+
+
+def testPlusMatchesAddInsteadOfLargerContainer():
+    elements = [
+        {"label": "Tasks", "box_2d": [100, 0, 900, 1000]},
+        {"label": "+", "box_2d": [900, 850, 950, 950]}
+    ]
+    assert labels(processElements(elements, WIDTH, HEIGHT, "Add new task button"))[0] == "+"
+
+
+def testGeminiOrderBreaksTiesBeforeSize():
+    elements = [
+        {"label": "small", "box_2d": [100, 0, 150, 100]},
+        {"label": "big", "box_2d": [200, 0, 900, 1000]}
+    ]
+    assert labels(processElements(elements, WIDTH, HEIGHT)) == ["small", "big"]
+    assert labels(processElements(elements, WIDTH, HEIGHT, "Unrelated target")) == ["small", "big"]
+
+
+def testProcessElementsAddsClickCentersAndKeepsUnboxed():
+    elements = [{"label": "Add", "box_2d": [0, 0, 100, 100]}, {"label": "no box"}]
+    ranked = processElements(elements, 1000, 1000, "Add")
+    assert ranked[0]["abs_box"] == [0, 0, 100, 100]
+    assert (ranked[0]["click_x"], ranked[0]["click_y"]) == (50, 50)
+    assert ranked[1] == {"label": "no box"}
@@ -0,0 +1,35 @@
+import numpy as np
+
+from frame_source import FrameRingBuffer
+
+
+def frame(value, size=100):
+    return np.full(size, value, dtype=np.uint8)
+
+
+def testPushEvictsByFrameCount():
+    buffer = FrameRingBuffer(max_frames=2, max_bytes=10 ** 6)
+    assert [buffer.push(frame(i)) for i in range(3)] == [1, 2, 3]
+    assert [sequence for sequence, _, _ in buffer.snapshot()] == [2, 3]
+    assert buffer.nbytes == 200
+    sequence, timestamp, latest = buffer.latest()
+    assert sequence == 3 and latest[0] == 2
+
+
+def testPushEvictsByByteCap():
+    buffer = FrameRingBuffer(max_frames=10, max_bytes=250)
+    for i in range(3):
+        buffer.push(frame(i))
+    assert len(buffer) == 2
+    assert buffer.nbytes == 200
+    # A frame larger than the cap is still kept as the newest one
+    buffer.push(frame(9, size=1000))
+    assert len(buffer) == 1
+    assert buffer.latest()[0] == 4
+    assert buffer.nbytes == 1000
+
+
+def testEmptyBuffer():
+    buffer = FrameRingBuffer(max_frames=0, max_bytes=0)
+    assert buffer.latest() is None
+    assert buffer.max_frames == 1
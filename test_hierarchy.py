@@ -0,0 +1,81 @@
+from hierarchy import HierarchyCache, HierarchySnapshot, parseBounds
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+  <node class="android.widget.FrameLayout" package="net.dinglisch.android.taskerm" bounds="[0,0][1080,2400]" enabled="true">
+    <node class="androidx.recyclerview.widget.RecyclerView" resource-id="net.dinglisch.android.taskerm:id/list" bounds="[0,200][1080,2400]" scrollable="true" enabled="true">
+      <node class="android.widget.TextView" text="Battery Saver" resource-id="net.dinglisch.android.taskerm:id/name" bounds="[0,200][1080,320]" clickable="true" enabled="true" />
+      <node class="android.widget.TextView" text="Morning Alarm" resource-id="net.dinglisch.android.taskerm:id/name" bounds="[0,320][1080,440]" clickable="true" enabled="true" />
+      <node class="android.widget.CheckBox" text="" content-desc="Enabled" bounds="[900,330][1000,430]" clickable="true" enabled="true" checked="true" />
+    </node>
+    <node class="android.widget.ImageButton" content-desc="Add" resource-id="net.dinglisch.android.taskerm:id/fab" bounds="[900,2200][1040,2340]" clickable="true" enabled="true" />
+  </node>
+</hierarchy>"""
+
+
+def testParseBounds():
+    assert parseBounds("[0,63][1080,210]") == (0, 63, 1080, 210)
+    assert parseBounds("") == (0, 0, 0, 0)
+
+
+def testSnapshotStructure():
+    snapshot = HierarchySnapshot(XML)
+    assert len(snapshot.nodes) == 6
+    alarm = snapshot.find(text="Morning Alarm")[0]
+    assert alarm.depth == 2
+    assert snapshot.parentOf(alarm).resource_id == "net.dinglisch.android.taskerm:id/list"
+    assert snapshot.packages() == ["net.dinglisch.android.taskerm"]
+
+
+def testFindByTextResourceIdAndClass():
+    snapshot = HierarchySnapshot(XML)
+    assert [n.text for n in snapshot.find(text="battery saver")] == ["Battery Saver"]
+    assert [n.content_desc for n in snapshot.find(text="add")] == ["Add"]
+    assert [n.text for n in snapshot.find(text="alarm", partial=True)] == ["Morning Alarm"]
+    assert len(snapshot.find(resource_id="net.dinglisch.android.taskerm:id/name")) == 2
+    assert snapshot.find(resource_id="net.dinglisch.android.taskerm:id/name", class_name="android.widget.CheckBox") == []
+    assert [n.class_name for n in snapshot.find(class_name="android.widget.ImageButton")] == ["android.widget.ImageButton"]
+    assert snapshot.find(text="Add").pop().center == (970, 2270)
+    assert len(snapshot.find(clickable=False)) == 2
+
+
+def testCoordinateLookupReturnsTopmostNode():
+    snapshot = HierarchySnapshot(XML)
+    assert snapshot.clickableAt(950, 380).content_desc == "Enabled"
+    assert snapshot.clickableAt(100, 380).text == "Morning Alarm"
+    assert snapshot.clickableAt(100, 100) is None
+    assert [n.class_name for n in snapshot.nodesAt(100, 100)] == ["android.widget.FrameLayout"]
+
+
+def testCacheDumpsOncePerFingerprint():
+    dumps = []
+
+    def dump():
+        dumps.append(1)
+        return XML
+
+    cache = HierarchyCache(dump, max_snapshots=2)
+    first = cache.snapshot("a")
+    assert cache.snapshot("a") is first
+    cache.snapshot("b")
+    cache.snapshot("c")
+    cache.snapshot("a")
+    assert len(dumps) == 4
+    cache.invalidate("a")
+    cache.snapshot("a")
+    assert len(dumps) == 5
+    assert cache.stats()["hits"] == 1
+
+
+def testCacheDumpsAgainAfterMaxAge(monkeypatch):
+    import hierarchy
+    now = [100.0]
+    monkeypatch.setattr(hierarchy.time, "time", lambda: now[0])
+    dumps = []
+    cache = HierarchyCache(lambda: dumps.append(1) or XML, max_age=10.0)
+    first = cache.snapshot("a")
+    now[0] += 5
+    assert cache.snapshot("a") is first
+    now[0] += 6
+    assert cache.snapshot("a") is not first
+    assert len(dumps) == 2
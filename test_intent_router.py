@@ -0,0 +1,58 @@
+import pytest
+
+from intent_router import DEFAULT_ANALYSIS_QUERY, classifyIntent, routeMessage
+
+WORKFLOW_ID = "0123456789abcdef0123456789abcdef"
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("create a task that checks battery", ("create", "create a task that checks battery")),
+    ("Please make a profile for wifi", ("create", "Please make a profile for wifi")),
+    ("test the task called Morning Alarm", ("test", "Morning Alarm")),
+    ("verify 'Battery Saver'", ("test", "Battery Saver")),
+    ("what's on the screen", ("analyze", DEFAULT_ANALYSIS_QUERY)),
+    ("check what is on the screen", ("analyze", DEFAULT_ANALYSIS_QUERY)),
+    ("analyze the Tasker task list", ("analyze", "analyze the Tasker task list")),
+    ("resume workflow " + WORKFLOW_ID, ("resume", WORKFLOW_ID)),
+    ("continue", ("resume", "")),
+    ("Resume the last workflow.", ("resume", "")),
+    ("please continue workflow " + WORKFLOW_ID, ("resume", WORKFLOW_ID))
+])
+def testRoutesUnambiguousRequests(message, expected):
+    assert classifyIntent(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "",
+    "How do I create a task?",
+    "make sure the alarm test passes",
+    "analyze the screen and create a task",
+    "check whether the alarm task works",
+    "verify that the alarm works",
+    "test it",
+    "make coffee",
+    "thanks!",
+    "don't create a task yet",
+    "Please do not make a profile",
+    "never test the Alarm task",
+    "ok, continue explaining the plan",
+    "continue explaining the plan",
+    "what is on screen? create a task"
+])
+def testLeavesMixedAndUnclearRequestsToTheLlm(message):
+    assert classifyIntent(message) is None
+
+
+def testRouteMessageRunsWorkflowAndSummarizes():
+    calls = []
+
+    def create(argument):
+        calls.append(argument)
+        return {"workflow": "creation_workflow", "status": "completed", "steps_completed": ["planning"], "workflow_id": WORKFLOW_ID}
+
+    routed = routeMessage("create a task for wifi", {"create": create})
+    assert calls == ["create a task for wifi"]
+    assert routed["intent"] == "create"
+    assert "creation_workflow: completed" in routed["summary"]
+    assert WORKFLOW_ID in routed["summary"]
+    assert routeMessage("test the task Alarm", {"create": create}) is None
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import job_server
+from job_server import STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED, JobQueue, JobServer, runJob
+
+
+def testEnqueueIsIdempotent(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    first = queue.enqueue("create", "create a task", idempotency_key="k")
+    second = queue.enqueue("create", "create a task", idempotency_key="k")
+    assert first["created"] and not second["created"]
+    assert first["job_id"] == second["job_id"]
+    assert queue.counts() == {STATUS_QUEUED: 1}
+
+
+def testClaimTakesHighestPriorityFirst(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("create", "low")
+    queue.enqueue("create", "high", priority=5)
+    job = queue.claim()
+    assert job["argument"] == "high"
+    assert job["status"] == STATUS_RUNNING
+    assert job["attempts"] == 1
+    assert queue.claim()["argument"] == "low"
+    assert queue.claim() is None
+
+
+def testFailRetriesWithBackoffUntilAttemptsRunOut(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_server, "RETRY_BASE_DELAY", 0.0)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("create", "task", max_attempts=2)["job_id"]
+    assert queue.fail(queue.claim(), "boom", {"status": "failed", "workflow_id": "w1"})
+    retried = queue.claim()
+    assert retried["attempts"] == 2
+    assert retried["result"] == {"status": "failed", "workflow_id": "w1"}
+    assert not queue.fail(retried, "boom again")
+    assert queue.get(job_id)["status"] == STATUS_FAILED
+    assert queue.claim() is None
+
+
+def testRetryIsDelayed(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("create", "task")
+    assert queue.fail(queue.claim(), "boom")
+    assert queue.claim() is None
+
+
+def testRequeueInterrupted(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("test", "Alarm")
+    queue.claim()
+    assert queue.requeueInterrupted() == 1
+    assert queue.counts() == {STATUS_QUEUED: 1}
+
+
+def testRunJobResumesUnfinishedWorkflow(monkeypatch):
+    from vision_tasker_agent import agent
+    calls = []
+
+    def resume(workflow_id):
+        calls.append(("resume", workflow_id))
+        return {} if workflow_id == "planless" else {"resumed_from_step": 1}
+
+    monkeypatch.setattr(agent, "executeCreationWorkflow", lambda argument, on_created=None: calls.append(("run", argument)) or {})
+    monkeypatch.setattr(agent, "resumeCreationWorkflow", resume)
+    runJob({"kind": "create", "argument": "task", "result": None})
+    runJob({"kind": "create", "argument": "task", "result": {"status": "failed", "workflow_id": "w1"}})
+    runJob({"kind": "create", "argument": "task", "result": {"status": "error", "workflow_id": "w2"}})
+    runJob({"kind": "create", "argument": "task", "result": {"status": "running", "workflow_id": "w3"}})
+    runJob({"kind": "create", "argument": "task", "result": {"status": "failed"}})
+    runJob({"kind": "create", "argument": "task", "result": {"status": "running", "workflow_id": "planless"}})
+    assert calls == [
+        ("run", "task"), ("resume", "w1"), ("resume", "w2"), ("resume", "w3"),
+        ("run", "task"), ("resume", "planless"), ("run", "task")
+    ]
+
+
+def testCrashedJobIsLinkedToItsWorkflow(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_server, "RETRY_BASE_DELAY", 0.0)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("create", "task")["job_id"]
+    queue.claim()
+    queue.linkWorkflow(job_id, "w1")
+    # The server dies here; on restart the job resumes the linked workflow
+    queue.requeueInterrupted()
+    assert queue.claim()["result"] == {"status": "running", "workflow_id": "w1"}
+
+
+def testFailWithoutResultKeepsLinkedWorkflow(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_server, "RETRY_BASE_DELAY", 0.0)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("create", "task")["job_id"]
+
+    def runner(job, on_workflow):
+        on_workflow("w1")
+        raise RuntimeError("device disconnected")
+
+    server = JobServer(queue, runner=runner)
+    server._execute(queue.claim())
+    job = queue.get(job_id)
+    assert job["status"] == STATUS_QUEUED
+    assert job["error"] == "device disconnected"
+    assert job["result"] == {"status": "running", "workflow_id": "w1"}
+
+
+def testWorkersClaimOnlyWhileHoldingTheDevice(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_server, "POLL_INTERVAL", 0.01)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    release = threading.Event()
+    order = []
+
+    def runner(job, on_workflow):
+        order.append(job["argument"])
+        if job["argument"] == "first":
+            release.wait(5)
+        return {"status": "completed"}
+
+    queue.enqueue("create", "first")
+    server = JobServer(queue, workers=2, runner=runner)
+    server.start()
+    try:
+        deadline = time.time() + 5
+        while not order and time.time() < deadline:
+            time.sleep(0.01)
+        queue.enqueue("create", "low")
+        queue.enqueue("create", "high", priority=5)
+        time.sleep(0.1)
+        # The idle worker must not have claimed a job while the device is busy
+        assert queue.counts() == {STATUS_RUNNING: 1, STATUS_QUEUED: 2}
+        release.set()
+        server.waitUntilIdle()
+    finally:
+        server.stop()
+    assert order == ["first", "high", "low"]
+    assert queue.counts() == {STATUS_SUCCEEDED: 3}
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from response_parser import StreamingJsonParser, parseStream, repairJson, stripCodeFences, validateElement, validateStep
+
+PLAN = {
+    "steps": [
+        {"step_number": 1, "action": "Open Tasker app", "ui_element": "Tasker app icon"},
+        {"step_number": 2, "action": "Tap the Tasks tab", "ui_element": "Tasks tab"},
+        {"step_number": 3, "action": "Tap +", "ui_element": "+"}
+    ]
+}
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def testRepairJsonStripsFencesAndTrailingCommas():
+    assert repairJson('Sure:\n```json\n{"a": [1, 2,],}\n```') == {"a": [1, 2]}
+
+
+def testRepairJsonClosesTruncatedDocument():
+    assert repairJson('{"steps": [{"step_number": 1, "action": "Open"}, {"step_num') == {
+        "steps": [{"step_number": 1, "action": "Open"}]
+    }
+
+
+def testRepairJsonRaisesOnGarbage():
+    with pytest.raises(json.JSONDecodeError):
+        repairJson("no json here")
+
+
+def testStripCodeFencesSkipsBracketsInProse():
+    text = 'Here [is] the plan: {"steps": []}'
+    assert stripCodeFences(text) == '{"steps": []}'
+    assert stripCodeFences('Step [1] of 2: [{"a": 1}]') == '[{"a": 1}]'
+
+
+def testValidators():
+    assert validateStep({"step_number": 1, "action": "Open"}) == []
+    assert validateStep({"step_number": 0, "action": ""}) != []
+    assert validateStep({"step_number": True, "action": "Open"}) != []
+    assert validateElement({"label": "Add", "box_2d": [10, 20, 30, 40]}) == []
+    assert validateElement({"label": "Add", "box_2d": [30, 20, 10, 40]}) != []
+    assert validateElement({"label": "Add", "box_2d": [0, 0, 2000, 10]}) != []
+
+
+@pytest.mark.parametrize("size", [1, 7, 10000])
+def testParseStreamEmitsItemsForAnyChunking(size):
+    emitted = []
+    result = parseStream(chunked(json.dumps(PLAN), size), "steps", validateStep, emitted.append)
+    assert emitted == PLAN["steps"]
+    assert result["document"] == PLAN
+    assert result["errors"] == []
+
+
+def testParseStreamEmitsEachItemAsSoonAsItCloses():
+    parser = StreamingJsonParser("steps", validateStep)
+    text = json.dumps(PLAN)
+    first_end = text.index("}") + 1
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [PLAN["steps"][0]]
+
+
+def testParseStreamDropsInvalidItems():
+    plan = {"steps": [{"step_number": 1, "action": "Open"}, {"step_number": -1, "action": "Bad"}]}
+    result = parseStream([json.dumps(plan)], "steps", validateStep)
+    assert result["items"] == [{"step_number": 1, "action": "Open"}]
+    assert result["document"] == {"steps": [{"step_number": 1, "action": "Open"}]}
+    assert result["errors"][0]["item"]["action"] == "Bad"
+
+
+def testParseStreamAcceptsBareArray():
+    result = parseStream(chunked(json.dumps(PLAN["steps"]), 5), "steps", validateStep)
+    assert result["document"] == PLAN["steps"]
+    assert len(result["items"]) == 3
+
+
+def testParseStreamIgnoresBracketsInLeadingProse():
+    text = "Here [is] the plan: " + json.dumps(PLAN) + " Enjoy [1]"
+    for size in (1, 4, 10000):
+        result = parseStream(chunked(text, size), "steps", validateStep)
+        assert result["items"] == PLAN["steps"]
+        assert result["document"] == PLAN
+
+
+def testParseStreamKeepsItemsOfTruncatedResponse():
+    text = json.dumps(PLAN)
+    cut = text.index('{"step_number": 3')
+    result = parseStream([text[:cut + 10]], "steps", validateStep)
+    assert result["items"] == PLAN["steps"][:2]
+    assert result["document"] == {"steps": PLAN["steps"][:2]}
+
+
+def testParseStreamReturnsNoneForProse():
+    result = parseStream(["I cannot help with that."], "steps", validateStep)
+    assert result["document"] is None
+    assert result["items"] == []
+
+
+@pytest.mark.parametrize("text, rejected, error", [
+    ('{"elements": [[1, 2, 3, 4]]}', [1, 2, 3, 4], "not an object"),
+    ('{"elements": [{"label": "Add"}, "Tasks"]}', "Tasks", "not an object"),
+    ('{"elements": {"label": "Add"}}', {"label": "Add"}, "'elements' is not an array"),
+    ('[7, {"label": "Add"}]', 7, "not an object")
+])
+def testNonObjectEntriesAreReported(text, rejected, error):
+    result = parseStream(chunked(text, 4), "elements")
+    assert all(isinstance(item, dict) for item in result["items"])
+    assert result["errors"] == [{"item": rejected, "errors": [error]}]
+
+
+def testAcceptItemRejectsNonObjects():
+    parser = StreamingJsonParser("elements")
+    assert parser._acceptItem("[1, 2]") is None
+    assert parser.items == []
+    assert parser.errors == [{"item": [1, 2], "errors": ["not an object"]}]
@@ -0,0 +1,79 @@
+from speculative_executor import SpeculativePlanRunner, isSafeStep, planConfirms
+
+STEPS = [
+    {"step_number": 1, "action": "Open Tasker app"},
+    {"step_number": 2, "action": "Tap the Tasks tab"},
+    {"step_number": 3, "action": "Enter task name", "input_text": "Battery"},
+    {"step_number": 4, "action": "Tap the Add Action button"}
+]
+
+
+def testIsSafeStep():
+    assert isSafeStep({"action": "Open Tasker app"})
+    assert isSafeStep({"action": "Tap the + icon"})
+    assert isSafeStep({"action": "+"})
+    assert not isSafeStep({"action": "Tap OK"})
+    assert not isSafeStep({"action": "Delete task"})
+    assert not isSafeStep({"action": "Tap the Tasks tab", "input_text": "x"})
+
+
+def testPlanConfirms():
+    plan = {"success": True, "plan": {"steps": STEPS}}
+    assert planConfirms(plan, STEPS[:2])
+    assert planConfirms({"success": False}, [])
+    assert not planConfirms({"success": False}, STEPS[:1])
+    assert not planConfirms({"success": True, "plan": "raw", "raw_response": True}, STEPS[:1])
+    assert not planConfirms({"success": True, "plan": {"steps": STEPS[1:]}}, STEPS[:1])
+    rejected = dict(plan, invalid_steps=[{"item": {"step_number": 1}, "errors": ["bad"]}])
+    assert not planConfirms(rejected, STEPS[:2])
+    late = dict(plan, invalid_steps=[{"item": {"step_number": 9}, "errors": ["bad"]}])
+    assert planConfirms(late, STEPS[:2])
+
+
+def runPlan(plan_result, execute_result=True):
+    executed = []
+    rolled_back = []
+
+    def generate(on_step):
+        for step in STEPS:
+            on_step(step)
+        return plan_result
+
+    def execute(index, step):
+        executed.append(index)
+        return execute_result
+
+    result = SpeculativePlanRunner(generate, execute, rolled_back.append).run()
+    return result, executed, rolled_back
+
+
+def testRunsSafePrefixAndStopsAtFirstUnsafeStep():
+    result, executed, rolled_back = runPlan({"success": True, "plan": {"steps": STEPS}})
+    assert executed == [0, 1]
+    assert result["executed"] == 2
+    assert result["speculated"] == 2
+    assert not result["rolled_back"]
+    assert rolled_back == []
+
+
+def testRollsBackWhenPlanDoesNotConfirm():
+    result, executed, rolled_back = runPlan({"success": True, "plan": "raw", "raw_response": True})
+    assert executed == [0, 1]
+    assert result["executed"] == 0
+    assert result["rolled_back"]
+    assert rolled_back == [STEPS[:2]]
+
+
+def testStopsSpeculatingAfterFailedStep():
+    result, executed, rolled_back = runPlan({"success": True, "plan": {"steps": STEPS}}, execute_result=False)
+    assert executed == [0]
+    assert result["executed"] == 0
+    assert not result["rolled_back"]
+
+
+def testGeneratorExceptionBecomesFailedPlan():
+    def generate(on_step):
+        raise RuntimeError("quota")
+
+    result = SpeculativePlanRunner(generate, lambda index, step: True, lambda steps: None).run()
+    assert result["plan_result"] == {"success": False, "error": "quota"}
@@ -0,0 +1,84 @@
+import pytest
+
+from text_input import (
+    METHOD_ADB_KEYBOARD, METHOD_CLIPBOARD, METHOD_INPUT_TEXT, METHOD_NONE, METHOD_SEND_KEYS,
+    chooseMethod, escapeInputText, fallbackOrder, injectText
+)
+
+
+class FakeDevice:
+    """uiautomator2 device double; shell() returns (output, exit_code) like ShellResponse."""
+
+    def __init__(self, exit_code=0, send_keys_error=None):
+        self.exit_code = exit_code
+        self.send_keys_error = send_keys_error
+        self.calls = []
+
+    def shell(self, command):
+        self.calls.append(("shell", command))
+        return ("Error: bad input" if self.exit_code else "", self.exit_code)
+
+    def send_keys(self, text, clear=False):
+        self.calls.append(("send_keys", text))
+        if self.send_keys_error is not None:
+            raise self.send_keys_error
+
+    def set_clipboard(self, text):
+        self.calls.append(("set_clipboard", text))
+
+
+def testEscapeInputText():
+    assert escapeInputText("Battery") == "Battery"
+    assert escapeInputText("Morning Alarm") == "Morning%sAlarm"
+    assert escapeInputText("a=b+c") == "a=b+c"
+    assert escapeInputText("it's") == "'it'\"'\"'s'"
+
+
+@pytest.mark.parametrize("text, adb_keyboard, expected", [
+    ("Battery Saver", False, METHOD_INPUT_TEXT),
+    ("", False, METHOD_INPUT_TEXT),
+    ("a much longer task name", False, METHOD_SEND_KEYS),
+    ("%BATT", False, METHOD_SEND_KEYS),
+    ("use %s here", False, METHOD_SEND_KEYS),
+    ("Café", False, METHOD_SEND_KEYS),
+    ("rm -rf; ls", False, METHOD_SEND_KEYS),
+    ("Café", True, METHOD_ADB_KEYBOARD)
+])
+def testChooseMethod(text, adb_keyboard, expected):
+    assert chooseMethod(text, adb_keyboard) == expected
+
+
+def testFallbackOrder():
+    assert fallbackOrder(METHOD_INPUT_TEXT, "Alarm") == [METHOD_INPUT_TEXT, METHOD_SEND_KEYS, METHOD_CLIPBOARD]
+    assert fallbackOrder(METHOD_SEND_KEYS, "%BATT") == [METHOD_SEND_KEYS, METHOD_CLIPBOARD]
+    assert fallbackOrder(METHOD_ADB_KEYBOARD, "long plain text here") == [
+        METHOD_ADB_KEYBOARD, METHOD_SEND_KEYS, METHOD_CLIPBOARD, METHOD_INPUT_TEXT
+    ]
+    # "%s" would become a space through `input text`
+    assert METHOD_INPUT_TEXT not in fallbackOrder(METHOD_SEND_KEYS, "a %s b")
+
+
+def testInjectTextUsesInputTextForShortAscii():
+    device = FakeDevice()
+    assert injectText(device, "Alarm 1")["method"] == METHOD_INPUT_TEXT
+    assert device.calls == [("shell", "input text Alarm%s1")]
+
+
+def testFailedShellExitCodeFallsThrough():
+    device = FakeDevice(exit_code=1)
+    assert injectText(device, "Alarm")["method"] == METHOD_SEND_KEYS
+    assert device.calls == [("shell", "input text Alarm"), ("send_keys", "Alarm")]
+
+
+def testRaisesWhenEveryMethodFails():
+    device = FakeDevice(exit_code=255, send_keys_error=RuntimeError("no IME"))
+    with pytest.raises(RuntimeError) as error:
+        injectText(device, "Alarm")
+    assert "input_text" in str(error.value)
+    assert "clipboard" in str(error.value)
+
+
+def testEmptyTextIsNotSent():
+    device = FakeDevice(exit_code=1)
+    assert injectText(device, "")["method"] == METHOD_NONE
+    assert device.calls == []
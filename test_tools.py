@@ -0,0 +1,78 @@
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    """tools imported against a minimal config.py, without a device."""
+    config = types.ModuleType("config")
+    config.GOOGLE_API_KEY = "key"
+    config.DEVICE_SERIAL = "serial"
+    config.DEVICE_WIDTH = 1080
+    config.DEVICE_HEIGHT = 2400
+    monkeypatch.setitem(sys.modules, "config", config)
+    monkeypatch.delitem(sys.modules, "settings", raising=False)
+    monkeypatch.delitem(sys.modules, "tools", raising=False)
+    import tools
+    return tools
+
+
+class FakeFrameSource:
+    def __init__(self):
+        self.frames = []
+
+    def latestFrame(self):
+        return self.frames[-1] if self.frames else None
+
+
+def testFingerprintIsRecheckedAfterMaxAge(tools, monkeypatch):
+    captures = []
+    monkeypatch.setattr(tools, "getFrameSource", lambda: None)
+    monkeypatch.setattr(tools, "captureScreen", lambda: captures.append(1) or {"success": True, "image_path": "s.png"})
+    monkeypatch.setattr(tools, "screenFingerprint", lambda path: "screen" + str(len(captures)))
+    assert tools._currentFingerprint() == "screen1"
+    assert tools._currentFingerprint() == "screen1"
+    monkeypatch.setattr(tools, "_screen_fingerprint_at", 0.0)
+    # A dialog may have appeared on its own meanwhile
+    assert tools._currentFingerprint() == "screen2"
+    tools.markScreenChanged()
+    assert tools._currentFingerprint() == "screen3"
+
+
+def testFingerprintFollowsNewStreamFrames(tools, monkeypatch):
+    source = FakeFrameSource()
+    monkeypatch.setattr(tools, "_frame_source", source)
+    monkeypatch.setattr(tools, "getFrameSource", lambda: source)
+    monkeypatch.setattr(tools, "imageFingerprint", lambda frame: frame)
+    monkeypatch.setattr(tools, "captureScreen", lambda: pytest.fail("no screenshot needed with a fresh stream"))
+    tools.markScreenChanged()
+    source.frames.append((1, tools._last_input_at + 0.1, "list"))
+    assert tools._currentFingerprint() == "list"
+    source.frames.append((2, tools._last_input_at + 0.2, "dialog"))
+    assert tools._currentFingerprint() == "dialog"
+
+
+def testIsFreshFrame(tools, monkeypatch):
+    monkeypatch.setattr(tools, "_last_input_at", 100.0)
+    monkeypatch.setattr(tools, "_input_frame_sequence", 7)
+    # Decoded before the input
+    assert not tools._isFreshFrame(9, 99.0)
+    # The first frame after the input can still be the one the parser held back
+    assert not tools._isFreshFrame(8, 100.5)
+    assert tools._isFreshFrame(9, 100.5)
+    # Without a frame at input time any frame decoded afterwards will do
+    monkeypatch.setattr(tools, "_input_frame_sequence", None)
+    assert tools._isFreshFrame(1, 100.5)
+    assert not tools._isFreshFrame(1, 100.0)
+
+
+def testMarkScreenChangedRecordsNewestFrame(tools, monkeypatch):
+    source = FakeFrameSource()
+    source.frames.append((5, 1.0, "frame"))
+    monkeypatch.setattr(tools, "_frame_source", source)
+    tools.markScreenChanged()
+    assert tools._input_frame_sequence == 5
+    assert not tools._isFreshFrame(6, tools._last_input_at + 1)
+    assert tools._isFreshFrame(7, tools._last_input_at + 1)
@@ -0,0 +1,67 @@
+from ui_map import UiMap, fingerprintDistance, normalizeAction
+
+A = "0" * 64
+B = "f" * 64
+C = "0" * 32 + "f" * 32
+D = "f" * 32 + "0" * 32
+
+
+def buildMap(path):
+    """A -tasks-> B -plus-> C, plus a shortcut A -menu-> C."""
+    ui_map = UiMap(str(path))
+    ui_map.observeScreen(A, name="home")
+    for start, action, goal in ((A, "Tasks tab", B), (B, "Plus button", C), (A, "Menu", C)):
+        ui_map.observeScreen(start)
+        ui_map.recordAction(start, action, {"label": action, "click_x": 1, "click_y": 2})
+        ui_map.observeScreen(goal)
+    return ui_map
+
+
+def testFingerprintHelpers():
+    assert fingerprintDistance(A, A) == 0
+    assert fingerprintDistance(A, B) == 256
+    assert normalizeAction("  Tap   the Tasks TAB ") == "tap the tasks tab"
+
+
+def testMatchScreenToleratesSmallDifferences(tmp_path):
+    ui_map = UiMap(str(tmp_path / "map.json"))
+    ui_map.observeScreen(A)
+    assert ui_map.matchScreen("0" * 63 + "3") == A
+    assert ui_map.matchScreen(B) is None
+
+
+def testObserveScreenCompletesPendingTransition(tmp_path):
+    ui_map = buildMap(tmp_path / "map.json")
+    edge = ui_map.knownAction(A, "tasks tab")
+    assert edge["to"] == B
+    assert edge["click_x"] == 1
+    assert ui_map.screens[B]["name"] == "after tasks tab"
+
+
+def testFindPathPrefersCheapestRoute(tmp_path):
+    ui_map = buildMap(tmp_path / "map.json")
+    assert [edge["action"] for edge in ui_map.findPath(A, C)] == ["menu"]
+    assert [edge["action"] for edge in ui_map.findPath(A, B)] == ["tasks tab"]
+    assert ui_map.findPath(A, A) == []
+
+
+def testFindPathAvoidsFailingEdges(tmp_path):
+    ui_map = buildMap(tmp_path / "map.json")
+    for _ in range(5):
+        ui_map.markFailure(A, "Menu")
+    assert [edge["action"] for edge in ui_map.findPath(A, C)] == ["tasks tab", "plus button"]
+
+
+def testFindPathUnreachable(tmp_path):
+    ui_map = buildMap(tmp_path / "map.json")
+    assert ui_map.findPath(C, A) is None
+    assert ui_map.findPath(A, D) is None
+
+
+def testMapPersistsAndFindsScreensByName(tmp_path):
+    path = tmp_path / "map.json"
+    buildMap(path)
+    reloaded = UiMap(str(path))
+    assert reloaded.findScreen("home") == A
+    assert reloaded.findScreen("after plus") == C
+    assert reloaded.findPath(A, B) is not None
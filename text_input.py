@@ -0,0 +1,128 @@
+import base64
+import re
+import shlex
+import time
+import logging
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# `input text` is only used for short strings made of these characters; it
+# sends one key event per character and mangles anything else
+INPUT_TEXT_SAFE = re.compile(r"^[A-Za-z0-9 ._,:/@+=-]*$")
+INPUT_TEXT_MAX_LENGTH = 16
+KEYCODE_PASTE = 279
+
+METHOD_INPUT_TEXT = "input_text"
+METHOD_SEND_KEYS = "send_keys"
+METHOD_CLIPBOARD = "clipboard"
+METHOD_ADB_KEYBOARD = "adb_keyboard"
+METHODS = [METHOD_INPUT_TEXT, METHOD_SEND_KEYS, METHOD_CLIPBOARD, METHOD_ADB_KEYBOARD]
+# Reported for empty text, which is not sent to the device at all
+METHOD_NONE = "none"
+
+
+def escapeInputText(text: str) -> str:
+    """Quote text for `adb shell input text` (spaces become %s)."""
+    return shlex.quote(text.replace(" ", "%s"))
+
+
+def chooseMethod(text: str, adb_keyboard: bool = False) -> str:
+    """Pick the fastest method that can enter a string correctly.
+
+    Short plain ASCII goes through `input text`, which needs no IME switch.
+    Everything else (long strings, unicode, shell metacharacters, Tasker %vars)
+    is set as a whole string: through ADBKeyboard when it is installed, else
+    through uiautomator2's input method.
+    """
+    if len(text) <= INPUT_TEXT_MAX_LENGTH and INPUT_TEXT_SAFE.match(text) and "%s" not in text:
+        return METHOD_INPUT_TEXT
+    if adb_keyboard:
+        return METHOD_ADB_KEYBOARD
+    return METHOD_SEND_KEYS
+
+
+def fallbackOrder(method: str, text: str) -> List[str]:
+    """Methods to try, starting with the chosen one."""
+    order = [method] + [m for m in (METHOD_SEND_KEYS, METHOD_CLIPBOARD) if m != method]
+    if method != METHOD_INPUT_TEXT and INPUT_TEXT_SAFE.match(text) and "%s" not in text:
+        order.append(METHOD_INPUT_TEXT)
+    return order
+
+
+def _shell(device: Any, command: str) -> str:
+    """Run a device shell command, raising on a non-zero exit code.
+
+    uiautomator2 returns the exit code instead of raising, so without this
+    check a failed command would count as entered text.
+    """
+    response = device.shell(command)
+    output, exit_code = response[0], response[1]
+    if exit_code != 0:
+        raise RuntimeError("Shell command exited with " + str(exit_code) + ": " + str(output).strip())
+    return output
+
+
+def _inputText(device: Any, text: str) -> None:
+    _shell(device, "input text " + escapeInputText(text))
+
+
+def _sendKeys(device: Any, text: str) -> None:
+    device.send_keys(text, clear=False)
+
+
+def _clipboard(device: Any, text: str) -> None:
+    device.set_clipboard(text)
+    _shell(device, "input keyevent " + str(KEYCODE_PASTE))
+
+
+def _adbKeyboard(device: Any, text: str) -> None:
+    # ADBKeyboard (com.android.adbkeyboard) must be the active IME
+    encoded = base64.b64encode(text.encode("utf-8")).decode("ascii")
+    _shell(device, "am broadcast -a ADB_INPUT_B64 --es msg " + encoded)
+
+
+_INJECTORS = {
+    METHOD_INPUT_TEXT: _inputText,
+    METHOD_SEND_KEYS: _sendKeys,
+    METHOD_CLIPBOARD: _clipboard,
+    METHOD_ADB_KEYBOARD: _adbKeyboard
+}
+
+
+def injectText(
+    device: Any,
+    text: str,
+    method: Optional[str] = None,
+    adb_keyboard: bool = False
+) -> Dict[str, Any]:
+    """Enter a whole string into the focused field.
+
+    Args:
+        device: Connected uiautomator2 device
+        text: Text to enter, any characters
+        method: Force a method from METHODS; chosen automatically when None
+        adb_keyboard: Whether the ADBKeyboard IME is installed and active
+
+    Returns:
+        dict: 'method' used (METHOD_NONE for empty text) and 'elapsed' seconds.
+
+    Raises:
+        RuntimeError: If every applicable method failed.
+    """
+    if method is not None and method not in _INJECTORS:
+        raise ValueError("Unknown text input method: " + method)
+    if not text:
+        return {"method": METHOD_NONE, "elapsed": 0.0}
+    chosen = method or chooseMethod(text, adb_keyboard)
+    candidates = [chosen] if method is not None else fallbackOrder(chosen, text)
+    errors = []
+    for candidate in candidates:
+        start = time.perf_counter()
+        try:
+            _INJECTORS[candidate](device, text)
+            return {"method": candidate, "elapsed": time.perf_counter() - start}
+        except Exception as e:
+            logger.warning("Text input via " + candidate + " failed: " + str(e))
+            errors.append(candidate + ": " + str(e))
+    raise RuntimeError("All text input methods failed (" + "; ".join(errors) + ")")
@@ -1,14 +1,21 @@
-import uiautomator2 as u2
-from adb_shell.adb_device import AdbDeviceUsb
-import google.generativeai as genai
-from google.generativeai.generative_models import GenerativeModel
-from google.adk.tools import FunctionTool
-from PIL import Image
-import json
 import time
 import logging
-from typing import Dict, Any, Optional, List
-from config import GOOGLE_API_KEY, DEVICE_SERIAL, DEVICE_WIDTH, DEVICE_HEIGHT
+from typing import Dict, Any, Optional, List, Callable, Iterable, TYPE_CHECKING
+from settings import (
+    DEVICE_SERIAL, DEVICE_WIDTH, DEVICE_HEIGHT, TASKER_PACKAGE_NAME, UI_MAP_PATH, TEMPLATE_DIR,
+    FRAME_SOURCE, FRAME_BUFFER_FRAMES, FRAME_BUFFER_MAX_MB, ADB_KEYBOARD, validateConfig
+)
+from response_parser import parseStream, validateElement, validateStep
+from ui_map import UiMap, screenFingerprint, imageFingerprint
+
+# Heavy backends (uiautomator2, adb_shell, Gemini, ADK, PIL, NumPy, OpenCV) are
+# imported on first use so that importing this module stays fast and works
+# without a device or credentials
+if TYPE_CHECKING:
+    from app_state import AppStateTracker
+    from element_detector import TemplateDetector
+    from frame_source import FrameSource
+    from hierarchy import HierarchyCache, HierarchySnapshot
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -17,19 +24,227 @@ logger = logging.getLogger(__name__)
 # Configure Gemini
 # Note: genai.configure is not needed with GenerativeModel
 
+MODEL_NAME = "gemini-2.0-flash"
+
+# Backend handles, created on first use and reused across tool calls
+_device = None  # type: Any
+_adb_device = None  # type: Any
+_model = None  # type: Any
+
+# Background screen stream (FRAME_SOURCE=screenrecord), started on first capture
+_frame_source = None  # type: Optional[FrameSource]
+_frame_source_failed = False
+_saved_frame_sequence = None  # type: Optional[int]
+# Time of the last tap, text entry or launch, and the newest stream frame at
+# that moment; frames not clearly decoded after it may show the old screen
+_last_input_at = 0.0
+_input_frame_sequence = None  # type: Optional[int]
+# How long captureScreen waits for a post-input frame before taking a screenshot
+STREAM_FRESH_WAIT = 0.3
+
+def getFrameSource() -> Optional["FrameSource"]:
+    """Get the running frame stream, or None when streaming is disabled or unavailable."""
+    global _frame_source, _frame_source_failed
+    if FRAME_SOURCE != "screenrecord" or _frame_source_failed:
+        return None
+    if _frame_source is None:
+        validateConfig()
+        from frame_source import FrameSource
+        _frame_source = FrameSource(
+            DEVICE_SERIAL,
+            max_frames=FRAME_BUFFER_FRAMES,
+            max_bytes=FRAME_BUFFER_MAX_MB * 1024 * 1024
+        )
+    if not _frame_source.running and not _frame_source.start():
+        logger.warning("Falling back to uiautomator2 screenshots")
+        _frame_source.stop()
+        _frame_source_failed = True
+        return None
+    return _frame_source
+
+def getLatestFrame() -> Optional[Any]:
+    """Return the newest streamed frame as an RGB NumPy array, without touching disk."""
+    source = getFrameSource()
+    latest = source.latestFrame() if source is not None else None
+    return latest[2] if latest is not None else None
+
+# Learned map of Tasker screens, loaded on first use
+_ui_map = None  # type: Optional[UiMap]
+
+def getUiMap() -> UiMap:
+    """Get the persistent Tasker screen graph, loading it on first use."""
+    global _ui_map
+    if _ui_map is None:
+        _ui_map = UiMap(UI_MAP_PATH)
+    return _ui_map
+
+# Local template detector for familiar widgets, loaded on first use
+_detector = None  # type: Optional[TemplateDetector]
+
+def getDetector() -> "TemplateDetector":
+    """Get the local element detector, loading its templates on first use."""
+    global _detector
+    if _detector is None:
+        from element_detector import TemplateDetector
+        _detector = TemplateDetector(TEMPLATE_DIR)
+    return _detector
+
+# Fingerprint of the screen as last observed, when it was taken and the newest
+# stream frame at that time; cleared by every input action
+_screen_fingerprint = None  # type: Optional[str]
+_screen_fingerprint_at = 0.0
+_fingerprint_frame_sequence = None  # type: Optional[int]
+# Seconds a fingerprint is trusted without a stream to re-check it against;
+# screens also change without our input (dialogs, lists finishing loading)
+FINGERPRINT_MAX_AGE = 2.0
+
+def _setFingerprint(fingerprint: str, sequence: Optional[int] = None) -> None:
+    """Record the observed fingerprint with its time and the newest stream frame."""
+    global _screen_fingerprint, _screen_fingerprint_at, _fingerprint_frame_sequence
+    if sequence is None and _frame_source is not None:
+        latest = _frame_source.latestFrame()
+        sequence = latest[0] if latest is not None else None
+    _screen_fingerprint = fingerprint
+    _screen_fingerprint_at = time.time()
+    _fingerprint_frame_sequence = sequence
+
+def _observeCurrentScreen(image_path: str) -> Optional[str]:
+    """Fingerprint a screenshot and register it in the UI map."""
+    try:
+        _setFingerprint(screenFingerprint(image_path))
+        return getUiMap().observeScreen(_screen_fingerprint)
+    except Exception as e:
+        logger.warning("UI map update failed: " + str(e))
+        return None
+
+# Parsed view-hierarchy snapshots per screen fingerprint, created on first use
+_hierarchy_cache = None  # type: Optional[HierarchyCache]
+
+def getHierarchyCache() -> "HierarchyCache":
+    """Get the per-screen cache of parsed dump_hierarchy snapshots."""
+    global _hierarchy_cache
+    if _hierarchy_cache is None:
+        from hierarchy import HierarchyCache
+        _hierarchy_cache = HierarchyCache(lambda: getDevice().dump_hierarchy(compressed=True))
+    return _hierarchy_cache
+
+def markScreenChanged() -> None:
+    """Forget the observed screen and its parsed hierarchy after any input or launch.
+    
+    Typing or toggling often leaves the fingerprint unchanged, so the snapshot
+    of the screen acted on is dropped rather than reused. The time is recorded
+    so captureScreen does not serve a stream frame from before the input.
+    """
+    global _screen_fingerprint, _fingerprint_frame_sequence, _last_input_at, _input_frame_sequence
+    if _screen_fingerprint is not None and _hierarchy_cache is not None:
+        _hierarchy_cache.invalidate(_screen_fingerprint)
+    _screen_fingerprint = None
+    _fingerprint_frame_sequence = None
+    _last_input_at = time.time()
+    latest = _frame_source.latestFrame() if _frame_source is not None else None
+    _input_frame_sequence = latest[0] if latest is not None else None
+
+def _currentFingerprint() -> str:
+    """Fingerprint of the screen as it is now.
+    
+    With the stream running, every new frame decoded since the last input is
+    fingerprinted in memory, which is cheap; without it, a screenshot is taken
+    again once the fingerprint is FINGERPRINT_MAX_AGE seconds old.
+    """
+    source = getFrameSource()
+    latest = source.latestFrame() if source is not None else None
+    if latest is not None and _isFreshFrame(latest[0], latest[1]):
+        if _screen_fingerprint is None or latest[0] != _fingerprint_frame_sequence:
+            _setFingerprint(imageFingerprint(latest[2]), latest[0])
+        return _screen_fingerprint
+    if _screen_fingerprint is None or time.time() - _screen_fingerprint_at > FINGERPRINT_MAX_AGE:
+        capture_result = captureScreen()
+        if not capture_result.get("success"):
+            raise RuntimeError("Screen capture failed: " + str(capture_result.get("error")))
+        _setFingerprint(screenFingerprint(capture_result["image_path"]))
+    return _screen_fingerprint
+
+def getHierarchy() -> "HierarchySnapshot":
+    """Get the indexed view hierarchy of the current screen.
+    
+    The snapshot is keyed by the current screen fingerprint, re-checked on
+    every call (see _currentFingerprint), so dialogs and screens that change
+    without our input get a new dump; input actions and Tasker launches also
+    drop the snapshot of the screen acted on. An unchanged screen is only
+    dumped and parsed again after hierarchy.MAX_SNAPSHOT_AGE, so repeated
+    lookups are dictionary lookups.
+    """
+    return getHierarchyCache().snapshot(_currentFingerprint())
+
 # Device connection function
 def getDevice() -> Any:
-    """Get connected Android device instance."""
-    if DEVICE_SERIAL is None:
-        raise ValueError("DEVICE_SERIAL environment variable is not set")
+    """Get connected Android device instance, connecting on first use."""
+    global _device
+    if _device is not None:
+        return _device
+    validateConfig()
     try:
-        device = u2.connect(DEVICE_SERIAL)
+        import uiautomator2 as u2
+        _device = u2.connect(DEVICE_SERIAL)
         logger.info("Successfully connected to device: " + DEVICE_SERIAL)
-        return device
+        return _device
     except Exception as e:
         logger.error("Failed to connect to device: " + str(e))
         raise
 
+# Foreground tracker for Tasker, created with the device connection
+_app_state = None  # type: Optional[AppStateTracker]
+
+def getAppState() -> "AppStateTracker":
+    """Get the session-level Tasker foreground tracker."""
+    global _app_state
+    if _app_state is None:
+        from app_state import AppStateTracker
+        _app_state = AppStateTracker(getDevice(), TASKER_PACKAGE_NAME, on_launch=markScreenChanged)
+    return _app_state
+
+def getAdbDevice() -> Any:
+    """Get the raw ADB shell connection used for input events, connecting on first use."""
+    global _adb_device
+    if _adb_device is not None and _adb_device.available:
+        return _adb_device
+    validateConfig()
+    from adb_shell.adb_device import AdbDeviceUsb
+    device = AdbDeviceUsb(serial=DEVICE_SERIAL)
+    device.connect()
+    _adb_device = device
+    return _adb_device
+
+def getModel() -> Any:
+    """Get the Gemini model, creating it on first use."""
+    global _model
+    if _model is None:
+        validateConfig()
+        from google.generativeai.generative_models import GenerativeModel
+        _model = GenerativeModel(MODEL_NAME)
+    return _model
+
+def _isFreshFrame(sequence: int, timestamp: float) -> bool:
+    """Whether a stream frame certainly shows the screen after the last input.
+    
+    The H.264 parser holds each frame until the next one arrives, so the first
+    frame decoded after an input may still be the one from before it.
+    """
+    if timestamp <= _last_input_at:
+        return False
+    return _input_frame_sequence is None or sequence >= _input_frame_sequence + 2
+
+def _freshFrame(source: "FrameSource") -> Optional[Any]:
+    """Newest stream frame taken after the last input, waiting briefly for one."""
+    deadline = time.time() + STREAM_FRESH_WAIT
+    while True:
+        latest = source.latestFrame()
+        if latest is not None and _isFreshFrame(latest[0], latest[1]):
+            return latest
+        if time.time() >= deadline:
+            return None
+        time.sleep(0.03)
+
 # Core tool functions with proper ADK structure
 def captureScreen() -> Dict[str, Any]:
     """Capture a screenshot of the current device screen.
@@ -40,66 +255,136 @@ def captureScreen() -> Dict[str, Any]:
     Returns:
         dict: Contains 'image_path' of the saved screenshot and 'success' status.
     """
+    global _saved_frame_sequence
     try:
         logger.info("Capturing screen...")
-        d = getDevice()
         img_path = "current_screen.png"
+        
+        # Newest frame from the background stream, written only when it changed
+        source = getFrameSource()
+        latest = _freshFrame(source) if source is not None else None
+        if latest is not None:
+            sequence, timestamp, frame = latest
+            if sequence != _saved_frame_sequence:
+                from PIL import Image
+                Image.fromarray(frame).save(img_path, compress_level=1)
+                _saved_frame_sequence = sequence
+            return {
+                "image_path": img_path,
+                "success": True,
+                "source": "stream",
+                "frame_age": round(time.time() - timestamp, 3)
+            }
+        
+        d = getDevice()
         d.screenshot(img_path)
+        _saved_frame_sequence = None
         logger.info("Screen captured successfully: " + img_path)
         return {"image_path": img_path, "success": True}
     except Exception as e:
         logger.error("Screen capture failed: " + str(e))
         return {"success": False, "error": str(e)}
 
-def analyzeImage(image_path: str, query: Optional[str] = None) -> Dict[str, Any]:
-    """Analyze an Android screen image using Gemini vision to identify UI elements.
-    
-    This tool uses Gemini vision AI to analyze screenshots and identify clickable UI elements,
-    providing bounding boxes and coordinates for automation.
-    
+def _responseChunks(response: Iterable[Any]) -> Iterable[str]:
+    """Yield the text of each chunk of a streamed Gemini response."""
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) raise on .text
+            continue
+        if text:
+            yield text
+
+def streamAnalysis(
+    image_path: str,
+    query: Optional[str] = None,
+    on_element: Optional[Callable[[Dict[str, Any]], None]] = None,
+    target: Optional[str] = None
+) -> Dict[str, Any]:
+    """Analyze a screen image, reporting each element as soon as it is streamed.
+
+    Same contract as analyzeImage, plus an optional callback that receives every
+    validated element (with absolute coordinates) while the response is still
+    arriving. The final element list is deduplicated and ranked against target.
+    When a target is given and the local detector recognizes it confidently,
+    Gemini is not called at all.
+
     Args:
         image_path: Path to the image file to analyze
-        query: Optional specific query for the analysis (default: general UI element detection)
-    
+        query: Optional specific query for the analysis
+        on_element: Optional callback invoked with each completed element
+        target: Optional description of the wanted element, used for ranking
+
     Returns:
         dict: Contains 'analysis' with detected elements including normalized and absolute coordinates.
     """
     if query is None:
         query = "Describe this Android screen, detect buttons/text, provide bounding boxes normalized 0-1000 for elements like 'Add Task'. Output as JSON."
     
+    from element_processing import processElements
+    
+    def handleElement(item: Dict[str, Any]) -> None:
+        if on_element is not None:
+            processElements([item], DEVICE_WIDTH, DEVICE_HEIGHT, target, None)
+            on_element(item)
+    
     try:
+        if target:
+            local_element = getDetector().detect(image_path, target)
+            if local_element is not None:
+                logger.info("Local detector matched '" + target + "' with score " + str(local_element["score"]))
+                if on_element is not None:
+                    on_element(local_element)
+                return {"analysis": {"elements": [local_element]}, "success": True, "source": "local"}
+        
         logger.info("Analyzing image: " + image_path + " with query: " + query)
-        model = GenerativeModel("gemini-2.0-flash")
+        from PIL import Image
+        model = getModel()
         img = Image.open(image_path)
         response = model.generate_content(
             [query, img],
-            generation_config={"response_mime_type": "application/json"}
+            generation_config={"response_mime_type": "application/json"},
+            stream=True
         )
-        analysis = json.loads(response.text)
+        parsed = parseStream(_responseChunks(response), "elements", validateElement, handleElement)
+        analysis = parsed["document"]
+        if isinstance(analysis, list):
+            analysis = {"elements": analysis}
+        if not isinstance(analysis, dict):
+            logger.error("Failed to parse Gemini response as JSON")
+            return {"success": False, "error": "Invalid JSON response", "raw_response": parsed["raw_text"]}
         
-        # Convert normalized boxes to absolute coords
-        for item in analysis.get("elements", []):
-            if "box_2d" in item:
-                box = item["box_2d"]  # [ymin, xmin, ymax, xmax] normalized 0-1000
-                item["abs_box"] = [
-                    int(box[1] / 1000 * DEVICE_WIDTH),  # xmin
-                    int(box[0] / 1000 * DEVICE_HEIGHT), # ymin
-                    int(box[3] / 1000 * DEVICE_WIDTH),  # xmax
-                    int(box[2] / 1000 * DEVICE_HEIGHT)  # ymax
-                ]
-                # Center for click
-                item["click_x"] = (item["abs_box"][0] + item["abs_box"][2]) // 2
-                item["click_y"] = (item["abs_box"][1] + item["abs_box"][3]) // 2
+        # Absolute coords, clamping, duplicate suppression and ranking in one pass
+        if isinstance(analysis.get("elements"), list):
+            analysis["elements"] = processElements(
+                analysis["elements"], DEVICE_WIDTH, DEVICE_HEIGHT, target
+            )
         
         logger.info("Image analysis complete, found " + str(len(analysis.get("elements", []))) + " elements")
-        return {"analysis": analysis, "success": True}
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse Gemini response as JSON: " + str(e))
-        return {"success": False, "error": "Invalid JSON response", "raw_response": response.text}
+        result = {"analysis": analysis, "success": True}
+        if parsed["errors"]:
+            result["invalid_elements"] = parsed["errors"]
+        return result
     except Exception as e:
         logger.error("Image analysis failed: " + str(e))
         return {"success": False, "error": str(e)}
 
+def analyzeImage(image_path: str, query: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze an Android screen image using Gemini vision to identify UI elements.
+    
+    This tool uses Gemini vision AI to analyze screenshots and identify clickable UI elements,
+    providing bounding boxes and coordinates for automation.
+    
+    Args:
+        image_path: Path to the image file to analyze
+        query: Optional specific query for the analysis (default: general UI element detection)
+    
+    Returns:
+        dict: Contains 'analysis' with detected elements including normalized and absolute coordinates.
+    """
+    return streamAnalysis(image_path, query)
+
 def performClick(x: int, y: int) -> Dict[str, Any]:
     """Perform a click action at specified coordinates on the Android device.
     
@@ -115,9 +400,9 @@ def performClick(x: int, y: int) -> Dict[str, Any]:
     """
     try:
         logger.info("Performing click at (" + str(x) + ", " + str(y) + ")")
-        device = AdbDeviceUsb(serial=DEVICE_SERIAL)
-        device.connect()
+        device = getAdbDevice()
         device.shell("input tap " + str(x) + " " + str(y))
+        markScreenChanged()
         time.sleep(1)  # Delay for UI response
         logger.info("Click executed successfully")
         return {"status": "Clicked at (" + str(x) + ", " + str(y) + ")", "success": True}
@@ -139,18 +424,60 @@ def performTextInput(text: str) -> Dict[str, Any]:
     """
     try:
         logger.info("Inputting text: " + text)
-        device = AdbDeviceUsb(serial=DEVICE_SERIAL)
-        device.connect()
-        # Escape quotes and special characters for shell
-        escaped_text = text.replace('"', '\\"').replace("'", "\\'")
-        device.shell('input text "' + escaped_text + '"')
+        from text_input import injectText
+        # Whole-string injection; the method is picked from length and character set
+        result = injectText(getDevice(), text, adb_keyboard=ADB_KEYBOARD)
+        markScreenChanged()
         time.sleep(1)  # Delay for text input
-        logger.info("Text input successful")
-        return {"status": "Input text: " + text, "success": True}
+        logger.info("Text input successful via " + result["method"])
+        return {"status": "Input text: " + text, "success": True, "method": result["method"]}
     except Exception as e:
         logger.error("Text input failed: " + str(e))
         return {"status": "Text input failed", "success": False, "error": str(e)}
 
+def findElement(text: str = "", resource_id: str = "", class_name: str = "") -> Dict[str, Any]:
+    """Find UI elements on the current screen in the Android view hierarchy.
+    
+    This tool looks elements up by visible text or content description (case-insensitive,
+    whole label first, then substring), resource id and/or class name, without vision
+    analysis. The hierarchy is parsed once per screen, so repeated lookups are cheap.
+    
+    Args:
+        text: Visible text or content description of the element
+        resource_id: Android resource id, e.g. "net.dinglisch.android.taskerm:id/fab"
+        class_name: Android class name, e.g. "android.widget.ImageButton"
+    
+    Returns:
+        dict: Contains 'elements' with text, resource id, class, bounds and click coordinates.
+    """
+    try:
+        logger.info("Finding element: text=" + repr(text) + " resource_id=" + repr(resource_id) + " class=" + repr(class_name))
+        snapshot = getHierarchy()
+        criteria = {
+            "text": text or None,
+            "resource_id": resource_id or None,
+            "class_name": class_name or None
+        }
+        nodes = snapshot.find(**criteria)
+        if not nodes and text:
+            nodes = snapshot.find(partial=True, **criteria)
+        elements = []
+        for node in nodes[:20]:
+            click_x, click_y = node.center
+            elements.append({
+                "text": node.text or node.content_desc,
+                "resource_id": node.resource_id,
+                "class": node.class_name,
+                "bounds": list(node.bounds),
+                "clickable": node.clickable,
+                "click_x": click_x,
+                "click_y": click_y
+            })
+        return {"elements": elements, "count": len(nodes), "success": True}
+    except Exception as e:
+        logger.error("Element lookup failed: " + str(e))
+        return {"success": False, "error": str(e)}
+
 def navigateTaskerStep(step_description: str) -> Dict[str, Any]:
     """Navigate through Tasker UI by finding and clicking elements based on description.
     
@@ -165,56 +492,172 @@ def navigateTaskerStep(step_description: str) -> Dict[str, Any]:
     """
     try:
         logger.info("Navigating Tasker step: " + step_description)
-        d = getDevice()
-        
-        # Launch Tasker if not already open
-        d.app_start("net.dinglisch.android.taskerm")
-        time.sleep(2)
+        # Launch Tasker only if it is not already in front, keeping the current screen
+        getAppState().ensureForeground()
         
         # Capture and analyze screen
         capture_result = captureScreen()
         if not capture_result.get("success"):
             return {"status": "failed", "error": "Screen capture failed"}
         
-        analysis_result = analyzeImage(
+        # Replay a learned action on a known screen without asking vision
+        ui_map = getUiMap()
+        screen_id = _observeCurrentScreen(capture_result["image_path"])
+        if screen_id is not None:
+            edge = ui_map.knownAction(screen_id, step_description)
+            if edge is not None and "click_x" in edge and "click_y" in edge:
+                logger.info("Using learned UI map action for: " + step_description)
+                click_result = performClick(edge["click_x"], edge["click_y"])
+                if click_result.get("success"):
+                    ui_map.recordAction(screen_id, step_description, edge)
+                    return {
+                        "status": "Step executed successfully",
+                        "success": True,
+                        "source": "ui_map",
+                        "element": _elementSummary(edge),
+                        "screen_id": screen_id
+                    }
+                ui_map.markFailure(screen_id, step_description)
+        
+        analysis_result = streamAnalysis(
             capture_result["image_path"], 
-            "Find element for: " + step_description + ". Provide box for click."
+            "Find element for: " + step_description + ". Provide box for click.",
+            target=step_description
         )
         
         if not analysis_result.get("success"):
             return {"status": "failed", "error": "Image analysis failed"}
         
-        # Click on the first matching element
+        # Click on the best ranked element
         elements = analysis_result.get("analysis", {}).get("elements", [])
         if elements:
             elem = elements[0]
             if "click_x" in elem and "click_y" in elem:
                 click_result = performClick(elem["click_x"], elem["click_y"])
                 if click_result.get("success"):
-                    return {"status": "Step executed successfully", "success": True}
+                    if screen_id is not None:
+                        ui_map.updateElements(screen_id, elements)
+                        ui_map.recordAction(screen_id, step_description, elem)
+                    if elem.get("source") != "local":
+                        getDetector().addTemplate(capture_result["image_path"], elem, step_description)
+                    return {
+                        "status": "Step executed successfully",
+                        "success": True,
+                        "element": _elementSummary(elem),
+                        "screen_id": screen_id
+                    }
                 else:
-                    return {"status": "Click failed", "success": False, "error": click_result.get("error")}
+                    return {"status": "Click failed", "success": False, "error": click_result.get("error"), "screen_id": screen_id}
         
-        return {"status": "Element not found", "success": False, "error": "No matching elements found"}
+        return {"status": "Element not found", "success": False, "error": "No matching elements found", "screen_id": screen_id}
     except Exception as e:
         logger.error("Navigation step failed: " + str(e))
         return {"status": "failed", "success": False, "error": str(e)}
 
-def generatePlan(description: str) -> Dict[str, Any]:
-    """Generate a structured plan for creating a Tasker task based on user description.
+def navigateToScreen(screen_name: str) -> Dict[str, Any]:
+    """Navigate to a previously learned Tasker screen along the shortest known path.
     
-    This tool uses Gemini to create a step-by-step plan for automating a task in Tasker.
-    The plan includes specific UI actions needed to create the automation.
+    This tool looks up the target screen in the learned UI map and replays the recorded
+    taps that lead there from the current screen, without any vision analysis.
+    Use navigateTaskerStep instead when the screen has never been visited.
     
     Args:
-        description: Natural language description of the desired Tasker automation
+        screen_name: Name (or part of the name) of the learned screen, e.g. "after tasks tab"
     
+    Returns:
+        dict: Contains execution status, number of actions replayed and any errors.
+    """
+    try:
+        logger.info("Navigating to learned screen: " + screen_name)
+        ui_map = getUiMap()
+        goal = ui_map.findScreen(screen_name)
+        if goal is None:
+            return {"status": "Unknown screen", "success": False, "error": "Screen not in UI map: " + screen_name}
+        
+        capture_result = captureScreen()
+        if not capture_result.get("success"):
+            return {"status": "failed", "success": False, "error": "Screen capture failed"}
+        current = _observeCurrentScreen(capture_result["image_path"])
+        if current is None:
+            return {"status": "failed", "success": False, "error": "Could not identify current screen"}
+        
+        path = ui_map.findPath(current, goal)
+        if path is None:
+            return {"status": "No known path", "success": False, "error": "No learned path to " + screen_name}
+        
+        error = replayPath(path)
+        if error is not None:
+            return {"status": "Path replay diverged", "success": False, "error": error}
+        
+        return {"status": "Reached " + screen_name, "success": True, "actions": len(path)}
+    except Exception as e:
+        logger.error("Navigation to screen failed: " + str(e))
+        return {"status": "failed", "success": False, "error": str(e)}
+
+def replayPath(path: List[Dict[str, Any]]) -> Optional[str]:
+    """Replay learned UI map edges, checking the screen reached after each tap.
+    
+    Returns:
+        str: Error message if a tap failed or led to an unexpected screen, else None.
+    """
+    ui_map = getUiMap()
+    for edge in path:
+        click_result = performClick(edge["click_x"], edge["click_y"])
+        capture_result = captureScreen()
+        reached = _observeCurrentScreen(capture_result["image_path"]) if capture_result.get("success") else None
+        if not click_result.get("success") or reached != edge["to"]:
+            ui_map.markFailure(edge["from"], edge["action"])
+            return "Unexpected screen after: " + edge["action"]
+    return None
+
+def ensureScreen(screen_id: str) -> Dict[str, Any]:
+    """Make sure a known UI map screen is displayed, navigating there if a path is known.
+    
+    Args:
+        screen_id: UI map id of the expected screen
+    
+    Returns:
+        dict: 'success', the 'screen_id' found on the device and the number of 'actions' replayed.
+    """
+    capture_result = captureScreen()
+    if not capture_result.get("success"):
+        return {"success": False, "error": "Screen capture failed"}
+    current = _observeCurrentScreen(capture_result["image_path"])
+    if current == screen_id:
+        return {"success": True, "screen_id": current, "actions": 0}
+    if current is None:
+        return {"success": False, "error": "Could not identify current screen"}
+    path = getUiMap().findPath(current, screen_id)
+    if path is None:
+        return {"success": False, "screen_id": current, "error": "No learned path to the expected screen"}
+    error = replayPath(path)
+    if error is not None:
+        return {"success": False, "error": error}
+    return {"success": True, "screen_id": screen_id, "actions": len(path)}
+
+def _elementSummary(element: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the fields of a resolved element that are needed to repeat a tap."""
+    return {k: element[k] for k in ("label", "click_x", "click_y", "abs_box", "score", "source") if k in element}
+
+def streamPlan(
+    description: str,
+    on_step: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """Generate a Tasker plan, reporting each step as soon as it is streamed.
+
+    Same contract as generatePlan, plus an optional callback that receives every
+    validated step while the rest of the plan is still being generated.
+
+    Args:
+        description: Natural language description of the desired Tasker automation
+        on_step: Optional callback invoked with each completed step
+
     Returns:
         dict: Contains the generated plan as a list of steps.
     """
     try:
         logger.info("Generating plan for: " + description)
-        model = GenerativeModel("gemini-2.0-flash")
+        model = getModel()
         
         prompt = """Create a detailed step-by-step plan to implement this Tasker automation: """ + description + """
         
@@ -233,20 +676,39 @@ def generatePlan(description: str) -> Dict[str, Any]:
         
         Include specific UI elements to click and any text to input."""
         
-        response = model.generate_content(prompt)
+        response = model.generate_content(prompt, stream=True)
+        parsed = parseStream(_responseChunks(response), "steps", validateStep, on_step)
+        plan = parsed["document"]
+        if isinstance(plan, list):
+            plan = {"steps": plan}
         
-        try:
-            plan = json.loads(response.text)
+        if isinstance(plan, dict):
             logger.info("Plan generated with " + str(len(plan.get("steps", []))) + " steps")
-            return {"plan": plan, "success": True}
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return the raw text
-            logger.warning("Failed to parse plan as JSON, returning raw text")
-            return {"plan": response.text, "raw_response": True, "success": True}
+            result = {"plan": plan, "success": True}
+            if parsed["errors"]:
+                result["invalid_steps"] = parsed["errors"]
+            return result
+        # If JSON parsing fails, return the raw text
+        logger.warning("Failed to parse plan as JSON, returning raw text")
+        return {"plan": parsed["raw_text"], "raw_response": True, "success": True}
     except Exception as e:
         logger.error("Plan generation failed: " + str(e))
         return {"success": False, "error": str(e)}
 
+def generatePlan(description: str) -> Dict[str, Any]:
+    """Generate a structured plan for creating a Tasker task based on user description.
+    
+    This tool uses Gemini to create a step-by-step plan for automating a task in Tasker.
+    The plan includes specific UI actions needed to create the automation.
+    
+    Args:
+        description: Natural language description of the desired Tasker automation
+    
+    Returns:
+        dict: Contains the generated plan as a list of steps.
+    """
+    return streamPlan(description)
+
 def testTask(task_name: str) -> Dict[str, Any]:
     """Test a Tasker task by executing it via intent and checking the result.
     
@@ -282,11 +744,25 @@ def testTask(task_name: str) -> Dict[str, Any]:
         logger.error("Task testing failed: " + str(e))
         return {"success": False, "passed": False, "error": str(e)}
 
-# Create FunctionTool instances for ADK
-captureScreenTool = FunctionTool(captureScreen)
-analyzeImageTool = FunctionTool(analyzeImage)
-performClickTool = FunctionTool(performClick)
-performTextInputTool = FunctionTool(performTextInput)
-navigateTaskerStepTool = FunctionTool(navigateTaskerStep)
-generatePlanTool = FunctionTool(generatePlan)
-testTaskTool = FunctionTool(testTask) 
\ No newline at end of file
+# FunctionTool instances for ADK, created on first access so that plain
+# function use does not import ADK
+TOOL_FUNCTIONS = {
+    "captureScreenTool": captureScreen,
+    "analyzeImageTool": analyzeImage,
+    "performClickTool": performClick,
+    "performTextInputTool": performTextInput,
+    "findElementTool": findElement,
+    "navigateTaskerStepTool": navigateTaskerStep,
+    "navigateToScreenTool": navigateToScreen,
+    "generatePlanTool": generatePlan,
+    "testTaskTool": testTask
+}
+_tool_instances = {}  # type: Dict[str, Any]
+
+def __getattr__(name: str) -> Any:
+    if name not in TOOL_FUNCTIONS:
+        raise AttributeError("module 'tools' has no attribute '" + name + "'")
+    if name not in _tool_instances:
+        from google.adk.tools import FunctionTool
+        _tool_instances[name] = FunctionTool(TOOL_FUNCTIONS[name])
+    return _tool_instances[name]
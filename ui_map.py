@@ -0,0 +1,249 @@
+import json
+import os
+import time
+import heapq
+import logging
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Fraction of the screen height covered by the status bar (clock, battery),
+# excluded from fingerprints so the same screen hashes the same over time
+STATUS_BAR_FRACTION = 0.05
+HASH_SIZE = 16
+# Maximum differing hash bits for two screenshots to count as the same screen
+MATCH_THRESHOLD = 24
+
+
+def screenFingerprint(image_path: str) -> str:
+    """Compute a perceptual fingerprint of a screenshot.
+
+    The status bar is cropped, the rest is reduced to a small grayscale grid and
+    each cell is compared with the mean brightness (average hash).
+
+    Args:
+        image_path: Path to the screenshot
+
+    Returns:
+        str: Hex encoded HASH_SIZE x HASH_SIZE bit hash.
+    """
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        return imageFingerprint(img)
+
+
+def imageFingerprint(img: Any) -> str:
+    """screenFingerprint for an image in memory: a PIL image or an RGB NumPy array (a stream frame)."""
+    from PIL import Image
+
+    if not isinstance(img, Image.Image):
+        img = Image.fromarray(img)
+    width, height = img.size
+    cropped = img.crop((0, int(height * STATUS_BAR_FRACTION), width, height))
+    small = cropped.convert("L").resize((HASH_SIZE, HASH_SIZE), Image.BILINEAR)
+    pixels = list(small.getdata())
+    mean = sum(pixels) / len(pixels)
+    bits = 0
+    for value in pixels:
+        bits = (bits << 1) | (1 if value >= mean else 0)
+    return format(bits, "0" + str(HASH_SIZE * HASH_SIZE // 4) + "x")
+
+
+def fingerprintDistance(a: str, b: str) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def normalizeAction(description: str) -> str:
+    """Canonical form of a free-text action used as an edge key."""
+    return " ".join(description.lower().split())
+
+
+class UiMap:
+    """Persistent graph of Tasker screens learned from successful runs.
+
+    Nodes are screen fingerprints with the elements seen on them; edges are
+    actions (a described tap at known coordinates) leading to another screen.
+    The graph is stored as JSON so it survives across sessions.
+    """
+
+    def __init__(self, path: str, match_threshold: int = MATCH_THRESHOLD) -> None:
+        self.path = path
+        self.match_threshold = match_threshold
+        self.screens = {}  # type: Dict[str, Dict[str, Any]]
+        self.edges = {}  # type: Dict[str, Dict[str, Dict[str, Any]]]
+        self._pending = None  # type: Optional[Dict[str, Any]]
+        self.load()
+
+    def load(self) -> None:
+        """Load the graph from disk, starting empty if the file is missing or corrupt."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.screens = data.get("screens", {})
+            self.edges = data.get("edges", {})
+            logger.info("Loaded UI map with " + str(len(self.screens)) + " screens from " + self.path)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable UI map " + self.path + ": " + str(e))
+
+    def save(self) -> None:
+        """Atomically write the graph to disk."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"screens": self.screens, "edges": self.edges}, f)
+        os.replace(tmp_path, self.path)
+
+    def matchScreen(self, fingerprint: str) -> Optional[str]:
+        """Return the id of the known screen closest to a fingerprint, if close enough."""
+        if fingerprint in self.screens:
+            return fingerprint
+        best_id = None
+        best_distance = self.match_threshold + 1
+        for screen_id in self.screens:
+            distance = fingerprintDistance(screen_id, fingerprint)
+            if distance < best_distance:
+                best_id = screen_id
+                best_distance = distance
+        return best_id
+
+    def observeScreen(
+        self,
+        fingerprint: str,
+        elements: Optional[List[Dict[str, Any]]] = None,
+        name: Optional[str] = None
+    ) -> str:
+        """Record that a screen is currently displayed.
+
+        Completes a pending transition recorded by recordAction(), so the
+        previous action gets an edge to this screen.
+
+        Args:
+            fingerprint: Fingerprint of the current screenshot
+            elements: Elements detected on the screen, if an analysis was done
+            name: Optional human readable name for the screen
+
+        Returns:
+            str: Id of the (possibly newly created) screen node.
+        """
+        screen_id = self.matchScreen(fingerprint)
+        now = time.time()
+        if screen_id is None:
+            screen_id = fingerprint
+            self.screens[screen_id] = {"elements": [], "name": name, "visits": 0, "first_seen": now}
+            logger.info("New Tasker screen learned: " + screen_id[:12])
+        screen = self.screens[screen_id]
+        screen["visits"] = screen.get("visits", 0) + 1
+        screen["last_seen"] = now
+        if elements:
+            screen["elements"] = _compactElements(elements)
+        if name and not screen.get("name"):
+            screen["name"] = name
+
+        if self._pending is not None:
+            pending = self._pending
+            self._pending = None
+            if pending["from"] != screen_id:
+                self._addEdge(pending["from"], pending["action"], screen_id, pending["element"])
+                if not screen.get("name"):
+                    screen["name"] = "after " + pending["action"]
+        self.save()
+        return screen_id
+
+    def updateElements(self, screen_id: str, elements: List[Dict[str, Any]]) -> None:
+        """Store the elements found by a vision analysis of a known screen."""
+        if screen_id in self.screens and elements:
+            self.screens[screen_id]["elements"] = _compactElements(elements)
+            self.save()
+
+    def recordAction(self, screen_id: str, action: str, element: Dict[str, Any]) -> None:
+        """Remember a successful action; its target is filled in by the next observeScreen()."""
+        self._pending = {
+            "from": screen_id,
+            "action": normalizeAction(action),
+            "element": {k: element[k] for k in ("label", "click_x", "click_y") if k in element}
+        }
+
+    def knownAction(self, screen_id: str, action: str) -> Optional[Dict[str, Any]]:
+        """Return the stored edge for an action on a screen, if it was learned before."""
+        return self.edges.get(screen_id, {}).get(normalizeAction(action))
+
+    def markFailure(self, screen_id: str, action: str) -> None:
+        """Penalize an edge whose replay did not work."""
+        edge = self.knownAction(screen_id, action)
+        if edge is not None:
+            edge["failures"] = edge.get("failures", 0) + 1
+            self.save()
+
+    def findScreen(self, name: str) -> Optional[str]:
+        """Find a screen id by (partial) name, preferring the most visited match."""
+        query = normalizeAction(name)
+        matches = [
+            (screen.get("visits", 0), screen_id)
+            for screen_id, screen in self.screens.items()
+            if screen.get("name") and query in normalizeAction(screen["name"])
+        ]
+        if not matches:
+            return None
+        return max(matches)[1]
+
+    def findPath(self, start: str, goal: str) -> Optional[List[Dict[str, Any]]]:
+        """Compute the cheapest known action path between two screens.
+
+        Edge cost grows with recorded failures so flaky actions are avoided.
+
+        Returns:
+            list: Edges to replay in order (empty if start == goal), or None if unreachable.
+        """
+        if start == goal:
+            return []
+        queue = [(0.0, 0, start)]  # type: List[Tuple[float, int, str]]
+        best = {start: 0.0}
+        previous = {}  # type: Dict[str, Tuple[str, Dict[str, Any]]]
+        counter = 0
+        while queue:
+            cost, _, screen_id = heapq.heappop(queue)
+            if screen_id == goal:
+                break
+            if cost > best.get(screen_id, float("inf")):
+                continue
+            for edge in self.edges.get(screen_id, {}).values():
+                target = edge["to"]
+                new_cost = cost + _edgeCost(edge)
+                if new_cost < best.get(target, float("inf")):
+                    best[target] = new_cost
+                    previous[target] = (screen_id, edge)
+                    counter += 1
+                    heapq.heappush(queue, (new_cost, counter, target))
+        if goal not in previous:
+            return None
+        path = []
+        node = goal
+        while node != start:
+            node, edge = previous[node]
+            path.append(edge)
+        path.reverse()
+        return path
+
+    def _addEdge(self, from_id: str, action: str, to_id: str, element: Dict[str, Any]) -> None:
+        actions = self.edges.setdefault(from_id, {})
+        edge = actions.get(action)
+        if edge is None or edge.get("to") != to_id:
+            edge = {"action": action, "from": from_id, "to": to_id, "uses": 0, "failures": 0}
+            actions[action] = edge
+        edge.update(element)
+        edge["uses"] = edge.get("uses", 0) + 1
+        edge["last_used"] = time.time()
+
+
+def _edgeCost(edge: Dict[str, Any]) -> float:
+    uses = edge.get("uses", 0)
+    failures = edge.get("failures", 0)
+    return 1.0 + 4.0 * failures / (uses + failures + 1)
+
+
+def _compactElements(elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    keys = ("label", "text", "type", "box_2d", "click_x", "click_y")
+    return [{k: e[k] for k in keys if k in e} for e in elements if isinstance(e, dict)]
@@ -1,9 +1,19 @@
-# Main module imports
-from .agent import root_agent, creation_workflow, testing_workflow, parallel_analysis
-from .vision_agent import vision_agent
-from .planner_agent import planner_agent
-from .navigator_agent import navigator_agent
-from .tester_agent import tester_agent
+# Main module exports, resolved lazily so that importing the package does not
+# load ADK, the device backends or build any agent
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    'agent': ('.agent', None),
+    'root_agent': ('.agent', 'root_agent'),
+    'creation_workflow': ('.agent', 'creation_workflow'),
+    'testing_workflow': ('.agent', 'testing_workflow'),
+    'parallel_analysis': ('.agent', 'parallel_analysis'),
+    'vision_agent': ('.vision_agent', 'vision_agent'),
+    'planner_agent': ('.planner_agent', 'planner_agent'),
+    'navigator_agent': ('.navigator_agent', 'navigator_agent'),
+    'tester_agent': ('.tester_agent', 'tester_agent')
+}
 
 __all__ = [
     'root_agent',
@@ -14,4 +24,13 @@ __all__ = [
     'planner_agent',
     'navigator_agent',
     'tester_agent'
-] 
\ No newline at end of file
+]
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    module_name, attribute = _EXPORTS[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
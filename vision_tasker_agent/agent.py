@@ -1,13 +1,8 @@
 # Install required package: pip install google-adk
-from google.adk.agents import Agent
-from google.adk.agents.sequential_agent import SequentialAgent
-from google.adk.agents.parallel_agent import ParallelAgent
-from google.adk.agents.loop_agent import LoopAgent
-from google.adk.tools import google_search, FunctionTool
 import sys
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable, List
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,35 +10,181 @@ logger = logging.getLogger(__name__)
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import tool instances from tools.py
-from tools import (
-    captureScreenTool, 
-    analyzeImageTool, 
-    performClickTool, 
-    performTextInputTool, 
-    navigateTaskerStepTool, 
-    generatePlanTool, 
-    testTaskTool
-)
-
-# Import sub-agents
-from vision_tasker_agent.vision_agent import vision_agent
-from vision_tasker_agent.planner_agent import planner_agent
-from vision_tasker_agent.navigator_agent import navigator_agent
-from vision_tasker_agent.tester_agent import tester_agent
+# ADK, the FunctionTool instances from tools.py and the sub-agents are only
+# imported when an agent is first accessed (see __getattr__ at the bottom), so
+# importing the workflow functions is fast and needs no credentials
+
+# Checkpoint store for creation workflows, opened on first use
+_checkpoint_store = None  # type: Any
+
+def getCheckpointStore() -> Any:
+    """Get the SQLite checkpoint store used to resume creation workflows."""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        from settings import CHECKPOINT_DB_PATH
+        from checkpoints import CheckpointStore
+        _checkpoint_store = CheckpointStore(CHECKPOINT_DB_PATH)
+    return _checkpoint_store
+
+# Store for bulky workflow outputs, opened on first use
+_artifact_store = None  # type: Any
+
+def getArtifactStore() -> Any:
+    """Get the artifact store holding full analyses, plans and screenshots."""
+    global _artifact_store
+    if _artifact_store is None:
+        from settings import ARTIFACT_DIR
+        from artifact_store import ArtifactStore
+        _artifact_store = ArtifactStore(ARTIFACT_DIR)
+    return _artifact_store
+
+def _storeAnalysis(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Save a full analysis out of band and return its compact summary with the artifact id."""
+    from artifact_store import summarizeAnalysis
+    summary = summarizeAnalysis(analysis_result)
+    summary["artifact_id"] = getArtifactStore().put("analysis", analysis_result)
+    return summary
+
+def _storePlan(plan_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Save a full plan out of band and return its compact summary with the artifact id."""
+    from artifact_store import summarizePlan
+    summary = summarizePlan(plan_result)
+    summary["artifact_id"] = getArtifactStore().put("plan", plan_result)
+    return summary
+
+def _executePlanStep(workflow_id: str, index: int, step: Dict[str, Any], workflow_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one plan step and checkpoint its outcome.
+    
+    Returns:
+        dict: The navigateTaskerStep result, with the step 'description'.
+    """
+    from tools import navigateTaskerStep
+    from checkpoints import STATUS_COMPLETED, STATUS_FAILED
+    store = getCheckpointStore()
+    step_desc = step.get("ui_element", step.get("action", ""))
+    if not step_desc:
+        store.recordStep(workflow_id, index, "", STATUS_COMPLETED)
+        return {"success": True, "description": ""}
+    nav_result = navigateTaskerStep(step_desc)
+    nav_result["description"] = step_desc
+    if not nav_result.get("success", False):
+        logger.warning("Navigation step failed: " + step_desc)
+        store.recordStep(
+            workflow_id, index, step_desc, STATUS_FAILED,
+            screen_id=nav_result.get("screen_id"),
+            error=nav_result.get("error")
+        )
+        return nav_result
+    store.recordStep(
+        workflow_id, index, step_desc, STATUS_COMPLETED,
+        element=nav_result.get("element"),
+        screen_id=nav_result.get("screen_id")
+    )
+    workflow_result["steps_completed"].append("navigate: " + step_desc)
+    return nav_result
+
+def _executePlanSteps(
+    workflow_id: str,
+    steps: List[Dict[str, Any]],
+    start_index: int,
+    workflow_result: Dict[str, Any]
+) -> bool:
+    """Run plan steps from start_index, checkpointing each one.
+    
+    Stops at the first failed step so the workflow can be resumed from there.
+    
+    Returns:
+        bool: True if every step from start_index succeeded.
+    """
+    from tools import getAppState
+    # Tasker in front once up front; the uiautomator2 agent is kept warm between workflows
+    getAppState().warmUp()
+    
+    for index in range(start_index, len(steps)):
+        nav_result = _executePlanStep(workflow_id, index, steps[index], workflow_result)
+        if not nav_result.get("success", False):
+            workflow_result["failed_step"] = {
+                "index": index, "description": nav_result["description"], "error": nav_result.get("error")
+            }
+            return False
+    return True
+
+def _speculatePlan(workflow_id: str, user_query: str, workflow_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Stream the plan and execute its safe leading steps before it is complete.
+    
+    Steps that the finished plan does not confirm are rolled back: their
+    checkpoints are dropped and the device returns to the screen the first
+    speculative step started on (along learned paths, or with back presses).
+    
+    Returns:
+        dict: The SpeculativePlanRunner.run() result.
+    """
+    from tools import streamPlan, getAppState, ensureScreen, getDevice, markScreenChanged
+    from speculative_executor import SpeculativePlanRunner
+    store = getCheckpointStore()
+    
+    def executeStep(index: int, step: Dict[str, Any]) -> bool:
+        return _executePlanStep(workflow_id, index, step, workflow_result).get("success", False)
+    
+    def rollback(executed: List[Dict[str, Any]]) -> None:
+        workflow = store.loadWorkflow(workflow_id)
+        start_screen = workflow["steps"][0]["screen_id"] if workflow and workflow["steps"] else None
+        store.clearSteps(workflow_id)
+        del workflow_result["steps_completed"][:]
+        if start_screen and ensureScreen(start_screen).get("success"):
+            return
+        for _ in executed:
+            getDevice().press("back")
+        markScreenChanged()
+    
+    getAppState().warmUp()
+    runner = SpeculativePlanRunner(lambda on_step: streamPlan(user_query, on_step), executeStep, rollback)
+    return runner.run()
+
+def _finishCreationWorkflow(workflow_id: str, completed: bool, workflow_result: Dict[str, Any]) -> None:
+    from checkpoints import STATUS_COMPLETED, STATUS_FAILED
+    getCheckpointStore().setStatus(workflow_id, STATUS_COMPLETED if completed else STATUS_FAILED)
+    if completed:
+        workflow_result["status"] = "completed"
+        workflow_result["message"] = "Creation workflow completed successfully"
+    else:
+        workflow_result["status"] = "failed"
+        workflow_result["message"] = "Stopped at a failed step; call resumeCreationWorkflow with the workflow_id to continue"
 
 # Workflow invocation functions - these will be wrapped as tools
 def runCreationWorkflow(user_query: str) -> Dict[str, Any]:
     """Execute the full creation workflow for creating a Tasker task.
     
     This tool runs the complete sequential workflow: planner -> vision -> navigator.
-    It automatically executes all steps needed to create a Tasker automation.
+    It automatically executes all steps needed to create a Tasker automation; leading
+    navigation-only steps start while the plan is still being generated.
+    Every step is checkpointed; if a step fails the workflow stops and can be
+    continued with resumeCreationWorkflow.
+    
+    Args:
+        user_query: Natural language description of the task to create
+    
+    Returns:
+        dict: Contains workflow execution status and results from each step. The plan and
+        screen analysis are summarized; their full content is available via fetchArtifact.
+    """
+    return executeCreationWorkflow(user_query)
+
+def executeCreationWorkflow(
+    user_query: str,
+    on_created: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """Run the creation workflow, reporting its checkpoint id as soon as it exists.
+    
+    Used by the job server so a job is linked to its workflow before any step runs
+    and a crash part way can still be resumed.
     
     Args:
         user_query: Natural language description of the task to create
+        on_created: Called with the workflow_id right after it is created
     
     Returns:
-        dict: Contains workflow execution status and results from each step.
+        dict: Same as runCreationWorkflow.
     """
     logger.info("Executing creation workflow for: " + user_query)
     
@@ -52,19 +193,43 @@ def runCreationWorkflow(user_query: str) -> Dict[str, Any]:
         "query": user_query,
         "steps_completed": []
     }
+    workflow_id = None
+    plan_stored = False
     
     try:
-        # Step 1: Generate plan using planner agent
+        # Step 1: Generate plan using planner agent; with speculative execution its
+        # safe leading steps already run on the device while the plan streams
         logger.info("Step 1: Generating plan...")
-        from tools import generatePlan
-        plan_result = generatePlan(user_query)
-        workflow_result["plan"] = plan_result
-        workflow_result["steps_completed"].append("planning")
+        from settings import SPECULATIVE_EXECUTION
+        from checkpoints import STATUS_ABANDONED
+        store = getCheckpointStore()
+        workflow_id = store.createWorkflow(user_query, {"steps": []})
+        workflow_result["workflow_id"] = workflow_id
+        if on_created is not None:
+            on_created(workflow_id)
+        start_index = 0
+        if SPECULATIVE_EXECUTION:
+            speculation = _speculatePlan(workflow_id, user_query, workflow_result)
+            plan_result = speculation.pop("plan_result")
+            start_index = speculation["executed"]
+            workflow_result["speculation"] = speculation
+        else:
+            from tools import generatePlan
+            plan_result = generatePlan(user_query)
+        workflow_result["plan"] = _storePlan(plan_result)
+        workflow_result["steps_completed"].insert(0, "planning")
         
         if not plan_result.get("success", False):
+            # Nothing to resume without a plan; a retry has to start over
+            store.setStatus(workflow_id, STATUS_ABANDONED)
+            workflow_result.pop("workflow_id")
             workflow_result["status"] = "failed"
             workflow_result["error"] = "Plan generation failed"
             return workflow_result
+        plan_steps = plan_result.get("plan", {})
+        steps = plan_steps.get("steps", []) if isinstance(plan_steps, dict) else []
+        store.setPlan(workflow_id, {"steps": steps})
+        plan_stored = True
         
         # Step 2: Analyze current screen using vision agent
         logger.info("Step 2: Analyzing current screen...")
@@ -75,27 +240,83 @@ def runCreationWorkflow(user_query: str) -> Dict[str, Any]:
                 screen_result["image_path"],
                 "Analyze Tasker UI and identify all clickable elements"
             )
-            workflow_result["vision_analysis"] = analysis_result
+            workflow_result["vision_analysis"] = _storeAnalysis(analysis_result)
             workflow_result["steps_completed"].append("vision_analysis")
         
         # Step 3: Execute navigation steps
         logger.info("Step 3: Executing navigation steps...")
-        plan_steps = plan_result.get("plan", {})
-        if isinstance(plan_steps, dict) and "steps" in plan_steps:
-            for step in plan_steps["steps"]:
-                step_desc = step.get("ui_element", step.get("action", ""))
-                if step_desc:
-                    from tools import navigateTaskerStep
-                    nav_result = navigateTaskerStep(step_desc)
-                    workflow_result["steps_completed"].append("navigate: " + step_desc)
-                    if not nav_result.get("success", False):
-                        logger.warning("Navigation step failed: " + step_desc)
-        
-        workflow_result["status"] = "completed"
-        workflow_result["message"] = "Creation workflow completed successfully"
+        completed = _executePlanSteps(workflow_id, steps, start_index, workflow_result)
+        _finishCreationWorkflow(workflow_id, completed, workflow_result)
         
     except Exception as e:
         logger.error("Creation workflow failed: " + str(e))
+        if workflow_id is not None and not plan_stored:
+            getCheckpointStore().setStatus(workflow_id, STATUS_ABANDONED)
+            workflow_result.pop("workflow_id", None)
+        workflow_result["status"] = "error"
+        workflow_result["error"] = str(e)
+    
+    return workflow_result
+
+def resumeCreationWorkflow(workflow_id: str = "") -> Dict[str, Any]:
+    """Resume a creation workflow that stopped part way, from its last good step.
+    
+    This tool reloads the checkpointed plan, checks that the device shows the screen the
+    next step expects (navigating there along learned paths if needed) and continues
+    without regenerating the plan or repeating completed taps.
+    
+    Args:
+        workflow_id: Id returned by runCreationWorkflow; empty resumes the most recent unfinished workflow
+    
+    Returns:
+        dict: Contains workflow execution status and the steps completed in this run.
+    """
+    from checkpoints import nextStepIndex
+    store = getCheckpointStore()
+    if not workflow_id:
+        workflow_id = store.latestResumable() or ""
+    logger.info("Resuming creation workflow: " + workflow_id)
+    
+    workflow_result = {
+        "workflow": "creation_workflow",
+        "workflow_id": workflow_id,
+        "resumed": True,
+        "steps_completed": []
+    }
+    
+    try:
+        workflow = store.loadWorkflow(workflow_id) if workflow_id else None
+        if workflow is None:
+            workflow_result["status"] = "failed"
+            workflow_result["error"] = "No resumable workflow found"
+            return workflow_result
+        workflow_result["query"] = workflow["query"]
+        
+        steps = workflow["plan"].get("steps", [])
+        if not steps:
+            workflow_result["status"] = "failed"
+            workflow_result["error"] = "Workflow has no plan to resume"
+            return workflow_result
+        start_index = nextStepIndex(workflow["steps"])
+        workflow_result["resumed_from_step"] = start_index
+        
+        # Check the device is where the next step expects it to be
+        checkpoints_by_index = {c["step_index"]: c for c in workflow["steps"]}
+        expected = checkpoints_by_index.get(start_index, {}).get("screen_id")
+        if expected:
+            from tools import ensureScreen
+            screen_result = ensureScreen(expected)
+            if not screen_result.get("success"):
+                workflow_result["status"] = "failed"
+                workflow_result["error"] = "Device is not on the expected screen: " + str(screen_result.get("error"))
+                return workflow_result
+            workflow_result["recovery_actions"] = screen_result.get("actions", 0)
+        
+        completed = _executePlanSteps(workflow_id, steps, start_index, workflow_result)
+        _finishCreationWorkflow(workflow_id, completed, workflow_result)
+    
+    except Exception as e:
+        logger.error("Resuming creation workflow failed: " + str(e))
         workflow_result["status"] = "error"
         workflow_result["error"] = str(e)
     
@@ -159,7 +380,8 @@ def runAnalysisWorkflow(screen_query: str) -> Dict[str, Any]:
         screen_query: Specific query about what to analyze on the screen
     
     Returns:
-        dict: Contains detailed analysis results from multiple perspectives.
+        dict: Contains compact summaries of each analysis with artifact ids; use
+        fetchArtifact to read the full element lists.
     """
     logger.info("Executing parallel analysis workflow: " + screen_query)
     
@@ -178,6 +400,7 @@ def runAnalysisWorkflow(screen_query: str) -> Dict[str, Any]:
             workflow_result["status"] = "failed"
             workflow_result["error"] = "Screen capture failed"
             return workflow_result
+        workflow_result["screenshot_artifact_id"] = getArtifactStore().putFile("screenshot", screen_result["image_path"])
         
         # Run multiple analyses in parallel (simulated)
         analysis_queries = [
@@ -191,7 +414,7 @@ def runAnalysisWorkflow(screen_query: str) -> Dict[str, Any]:
             analysis_result = analyzeImage(screen_result["image_path"], query)
             workflow_result["analyses"].append({
                 "query": query,
-                "result": analysis_result
+                "result": _storeAnalysis(analysis_result)
             })
         
         workflow_result["status"] = "completed"
@@ -204,17 +427,8 @@ def runAnalysisWorkflow(screen_query: str) -> Dict[str, Any]:
     
     return workflow_result
 
-# Create FunctionTool wrappers for the workflow functions
-runCreationWorkflowTool = FunctionTool(runCreationWorkflow)
-runTestingWorkflowTool = FunctionTool(runTestingWorkflow)
-runAnalysisWorkflowTool = FunctionTool(runAnalysisWorkflow)
-
 # Root agent with action-oriented instructions
-root_agent = Agent(
-    name="pixel_tasker_agent",
-    description="Root agent orchestrating multi-agent Tasker automation.",
-    model="gemini-2.0-flash",
-    instruction="""You are a Tasker automation assistant for Pixel 8 Pro. You MUST IMMEDIATELY execute tools based on user requests.
+ROOT_INSTRUCTION = """You are a Tasker automation assistant for Pixel 8 Pro. You MUST IMMEDIATELY execute tools based on user requests.
 
 CRITICAL RULES:
 1. NEVER describe what you will do. ALWAYS execute tools immediately.
@@ -226,18 +440,26 @@ TOOL USAGE PATTERNS:
 For CREATION requests (keywords: create, make, build, set up, add):
 → IMMEDIATELY call runCreationWorkflow with the user's request
 
+For RESUME requests (keywords: resume, continue, retry, pick up where it stopped):
+→ IMMEDIATELY call resumeCreationWorkflow with the workflow_id from the failed run (or empty for the latest)
+
 For TESTING requests (keywords: test, verify, check, validate):
 → IMMEDIATELY call runTestingWorkflow with the task name
 
 For ANALYSIS requests (keywords: analyze, look at, examine, what's on screen):
 → IMMEDIATELY call runAnalysisWorkflow with the analysis query
 
+Workflow results contain compact summaries with artifact ids. Only when the user needs
+details (full element lists, every plan step, screenshots) → call fetchArtifact with the
+artifact_id and, if possible, a path such as "analysis.elements" or "plan.steps"
+
 For SPECIFIC ACTIONS:
 - To capture screen → call captureScreen
 - To analyze an image → call analyzeImage with image path and query
 - To click somewhere → call performClick with x,y coordinates
 - To input text → call performTextInput with the text
 - To navigate UI → call navigateTaskerStep with step description
+- To return to a learned screen → call navigateToScreen with the screen name
 
 EXAMPLE INTERACTIONS:
 
@@ -253,45 +475,9 @@ User: "what's on the screen?"
 You: [IMMEDIATELY call runAnalysisWorkflow("describe all UI elements on screen")]
 Then report what was found.
 
-NEVER provide explanatory text before executing tools. Execute first, explain results after.""",
-    tools=[
-        runCreationWorkflowTool,
-        runTestingWorkflowTool,
-        runAnalysisWorkflowTool,
-        captureScreenTool,
-        analyzeImageTool,
-        performClickTool,
-        performTextInputTool,
-        navigateTaskerStepTool,
-        generatePlanTool,
-        testTaskTool,
-        google_search
-    ]
-)
+NEVER provide explanatory text before executing tools. Execute first, explain results after."""
 
-# Define the actual workflow agents (these are orchestrated by the root agent's tools)
-creation_workflow = SequentialAgent(
-    name="creation_workflow",
-    sub_agents=[
-        planner_agent,  # Step 1: Plan the task
-        vision_agent,   # Step 2: Analyze current screen
-        navigator_agent # Step 3: Execute navigation
-    ]
-)
-
-testing_workflow = LoopAgent(
-    name="testing_workflow",
-    sub_agents=[tester_agent],
-    max_iterations=3
-)
-
-# For parallel analysis, we need to create separate vision agent instances
-# since each agent can only have one parent in ADK
-vision_agent_1 = Agent(
-    name="vision_agent_1",
-    description="Sub-agent for capturing and analyzing Pixel screen via Gemini vision (parallel instance 1).",
-    model="gemini-2.0-flash",
-    instruction="""You are responsible for visual analysis of the Pixel 8 Pro screen.
+PARALLEL_VISION_INSTRUCTION = """You are responsible for visual analysis of the Pixel 8 Pro screen.
     Your tasks:
     1. Capture screen screenshots of the current UI state
     2. Analyze images using Gemini vision to identify UI elements
@@ -300,29 +486,173 @@ vision_agent_1 = Agent(
     5. Detect specific UI elements requested by other agents
     
     Always provide detailed descriptions with normalized coordinates and absolute pixel coordinates.
-    Focus on actionable UI elements like buttons, text fields, and navigation elements.""",
-    tools=[captureScreenTool, analyzeImageTool]
-)
-
-vision_agent_2 = Agent(
-    name="vision_agent_2",
-    description="Sub-agent for capturing and analyzing Pixel screen via Gemini vision (parallel instance 2).",
-    model="gemini-2.0-flash",
-    instruction="""You are responsible for visual analysis of the Pixel 8 Pro screen.
-    Your tasks:
-    1. Capture screen screenshots of the current UI state
-    2. Analyze images using Gemini vision to identify UI elements
-    3. Provide bounding boxes and click coordinates for interactive elements
-    4. Describe the current screen state for navigation planning
-    5. Detect specific UI elements requested by other agents
+    Focus on actionable UI elements like buttons, text fields, and navigation elements."""
+
+def fetchArtifact(artifact_id: str, path: str = "") -> Dict[str, Any]:
+    """Fetch the full content of an artifact referenced by a workflow result.
     
-    Always provide detailed descriptions with normalized coordinates and absolute pixel coordinates.
-    Focus on actionable UI elements like buttons, text fields, and navigation elements.""",
-    tools=[captureScreenTool, analyzeImageTool]
-)
+    Workflow results only carry compact summaries; use this tool when the details are
+    needed, e.g. the full element list of an analysis or every step of a plan.
+    
+    Args:
+        artifact_id: The artifact_id from a workflow result (e.g. "analysis-3f2a...")
+        path: Optional dotted path to return only part of it, e.g. "analysis.elements.0" or "plan.steps"
+    
+    Returns:
+        dict: Contains 'kind' and the requested 'data', or an error.
+    """
+    from artifact_store import selectPath
+    record = getArtifactStore().get(artifact_id)
+    if record is None:
+        return {"success": False, "error": "Unknown artifact: " + artifact_id}
+    try:
+        data = selectPath(record["data"], path)
+    except KeyError as e:
+        return {"success": False, "error": "Path not found in artifact: " + str(e)}
+    return {"success": True, "artifact_id": artifact_id, "kind": record["kind"], "path": path, "data": data}
+
+def routeIntent(callback_context: Any, llm_request: Any) -> Any:
+    """before_model_callback that answers unambiguous requests without the LLM.
+    
+    When the latest user message clearly asks to create, test, analyze or resume,
+    the matching workflow runs directly and its summary is returned as the model
+    response, saving the root agent's model round trip. Anything else (questions,
+    direct actions, mixed intents, tool result turns) goes to the LLM unchanged.
+    """
+    from settings import INTENT_ROUTER
+    if not INTENT_ROUTER or not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or not last.parts:
+        return None
+    if any(part.function_response is not None for part in last.parts):
+        return None
+    message = "".join(part.text for part in last.parts if part.text)
+    
+    from intent_router import routeMessage
+    routed = routeMessage(message, {
+        "create": runCreationWorkflow,
+        "test": runTestingWorkflow,
+        "analyze": runAnalysisWorkflow,
+        "resume": resumeCreationWorkflow
+    })
+    if routed is None:
+        return None
+    
+    from google.adk.models import LlmResponse
+    from google.genai import types
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=routed["summary"])]))
+
+def buildRootAgent() -> Any:
+    """Construct the root agent together with its tool wrappers."""
+    from google.adk.agents import Agent
+    from google.adk.tools import google_search, FunctionTool
+    from tools import (
+        captureScreenTool, 
+        analyzeImageTool, 
+        performClickTool, 
+        performTextInputTool, 
+        navigateTaskerStepTool, 
+        navigateToScreenTool,
+        findElementTool,
+        generatePlanTool, 
+        testTaskTool
+    )
+    
+    return Agent(
+        name="pixel_tasker_agent",
+        description="Root agent orchestrating multi-agent Tasker automation.",
+        model="gemini-2.0-flash",
+        instruction=ROOT_INSTRUCTION,
+        before_model_callback=routeIntent,
+        tools=[
+            # FunctionTool wrappers for the workflow functions
+            FunctionTool(runCreationWorkflow),
+            FunctionTool(resumeCreationWorkflow),
+            FunctionTool(runTestingWorkflow),
+            FunctionTool(runAnalysisWorkflow),
+            FunctionTool(fetchArtifact),
+            captureScreenTool,
+            analyzeImageTool,
+            performClickTool,
+            performTextInputTool,
+            navigateTaskerStepTool,
+            navigateToScreenTool,
+            findElementTool,
+            generatePlanTool,
+            testTaskTool,
+            google_search
+        ]
+    )
+
+# Define the actual workflow agents (these are orchestrated by the root agent's tools)
+def buildCreationWorkflow() -> Any:
+    """Construct the sequential planner -> vision -> navigator workflow agent."""
+    from google.adk.agents.sequential_agent import SequentialAgent
+    from vision_tasker_agent.vision_agent import vision_agent
+    from vision_tasker_agent.planner_agent import planner_agent
+    from vision_tasker_agent.navigator_agent import navigator_agent
+    
+    return SequentialAgent(
+        name="creation_workflow",
+        sub_agents=[
+            planner_agent,  # Step 1: Plan the task
+            vision_agent,   # Step 2: Analyze current screen
+            navigator_agent # Step 3: Execute navigation
+        ]
+    )
+
+def buildTestingWorkflow() -> Any:
+    """Construct the looping tester workflow agent."""
+    from google.adk.agents.loop_agent import LoopAgent
+    from vision_tasker_agent.tester_agent import tester_agent
+    
+    return LoopAgent(
+        name="testing_workflow",
+        sub_agents=[tester_agent],
+        max_iterations=3
+    )
+
+def buildParallelVisionAgent(index: int) -> Any:
+    """Construct one vision agent instance for the parallel analysis workflow.
+    
+    Separate instances are needed since each agent can only have one parent in ADK.
+    """
+    from google.adk.agents import Agent
+    from tools import captureScreenTool, analyzeImageTool
+    
+    return Agent(
+        name="vision_agent_" + str(index),
+        description="Sub-agent for capturing and analyzing Pixel screen via Gemini vision (parallel instance " + str(index) + ").",
+        model="gemini-2.0-flash",
+        instruction=PARALLEL_VISION_INSTRUCTION,
+        tools=[captureScreenTool, analyzeImageTool]
+    )
 
 # Optional parallel workflow for complex screen analysis
-parallel_analysis = ParallelAgent(
-    name="parallel_analysis",
-    sub_agents=[vision_agent_1, vision_agent_2]  # Use separate instances
-) 
\ No newline at end of file
+def buildParallelAnalysis() -> Any:
+    """Construct the parallel screen analysis workflow agent."""
+    from google.adk.agents.parallel_agent import ParallelAgent
+    
+    return ParallelAgent(
+        name="parallel_analysis",
+        sub_agents=[buildParallelVisionAgent(1), buildParallelVisionAgent(2)]
+    )
+
+# Agents are built on first attribute access and cached, e.g. `adk web`
+# only pays for root_agent and nothing builds parallel_analysis unless asked
+AGENT_BUILDERS = {
+    "root_agent": buildRootAgent,
+    "creation_workflow": buildCreationWorkflow,
+    "testing_workflow": buildTestingWorkflow,
+    "parallel_analysis": buildParallelAnalysis
+}  # type: Dict[str, Callable[[], Any]]
+_agents = {}  # type: Dict[str, Any]
+
+def __getattr__(name: str) -> Any:
+    if name not in AGENT_BUILDERS:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    if name not in _agents:
+        logger.info("Building " + name)
+        _agents[name] = AGENT_BUILDERS[name]()
+    return _agents[name]
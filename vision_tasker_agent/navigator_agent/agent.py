@@ -2,7 +2,7 @@ from google.adk.agents import Agent
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from tools import performClickTool, navigateTaskerStepTool, performTextInputTool
+from tools import performClickTool, navigateTaskerStepTool, navigateToScreenTool, performTextInputTool, findElementTool
 
 navigator_agent = Agent(
     name="navigator_agent",
@@ -18,6 +18,8 @@ CRITICAL RULES:
    - performClick for clicking at specific coordinates
    - performTextInput for entering text
    - navigateTaskerStep for high-level navigation tasks
+   - navigateToScreen to jump to a previously learned Tasker screen
+   - findElement to get the coordinates of an element by its text or resource id
 3. Report results only after execution
 
 ACTION PATTERNS:
@@ -31,6 +33,12 @@ For text input:
 For navigation steps:
 → IMMEDIATELY call navigateTaskerStep("description of UI element")
 
+For elements with known text or resource id:
+→ IMMEDIATELY call findElement("text"), then performClick with its click_x, click_y
+
+For returning to a screen already visited in earlier runs:
+→ IMMEDIATELY call navigateToScreen("screen name")
+
 EXECUTION FLOW:
 1. Receive navigation instruction
 2. Choose appropriate tool
@@ -40,5 +48,5 @@ EXECUTION FLOW:
 
 Never say "I will click..." or "Let me navigate..."
 Just execute and report results.""",
-    tools=[performClickTool, navigateTaskerStepTool, performTextInputTool]
+    tools=[performClickTool, navigateTaskerStepTool, navigateToScreenTool, performTextInputTool, findElementTool]
 ) 
\ No newline at end of file